@@ -0,0 +1,74 @@
+import numpy as np
+
+
+def square_footprint(radius):
+    """Footprint mask covering every tile within ``radius`` (Chebyshev distance)."""
+    return np.ones((2 * radius + 1, 2 * radius + 1), dtype=np.float64)
+
+
+class AreaEffect:
+    """An effect that buildings spread over the tiles around them.
+
+    ``footprint`` is the convolution kernel, centred on the source tile. All
+    sources that fire in one tick are applied together: the kernel is
+    scattered around each source and the overlapping contributions summed,
+    i.e. the source grid convolved with the kernel, evaluated only at the
+    tiles it reaches. The cost follows sources x footprint size, not map size.
+    """
+
+    def __init__(self, footprint, column, amount, limit=None, farm_only=True):
+        self.footprint = np.asarray(footprint, dtype=np.float64)
+        self.column = column
+        self.amount = amount
+        self.limit = limit
+        self.farm_only = farm_only
+
+        # Precomputed non-zero kernel taps as offsets from the centre
+        center_row, center_col = self.footprint.shape[0] // 2, self.footprint.shape[1] // 2
+        rows, cols = np.nonzero(self.footprint)
+        self.offset_rows = rows - center_row
+        self.offset_cols = cols - center_col
+        self.weights = self.footprint[rows, cols]
+
+    def apply(self, engine, sources):
+        """Apply the effect once per entry in ``sources`` (tile indices, repeats allowed)."""
+        if len(sources) == 0:
+            return
+        targets, strength = self.spread(engine, sources)
+
+        values = getattr(engine, self.column)
+        updated = values[targets] + self.amount * strength
+        if self.limit is not None:
+            updated = np.minimum(self.limit, updated)
+        values[targets] = updated
+        engine.dirty[targets] = True
+
+    def field(self, engine, sources):
+        """Dense per-tile total of one application from every source (without ``limit``)."""
+        total = np.zeros(engine.size, dtype=np.float64)
+        if len(sources):
+            targets, strength = self.spread(engine, sources)
+            total[targets] = self.amount * strength
+        return total
+
+    def spread(self, engine, sources):
+        """``(targets, strength)``: tiles the sources reach and the summed kernel weight on each."""
+        sources = np.asarray(sources)
+        rows = (sources // engine.cols)[:, None] + self.offset_rows
+        cols = (sources % engine.cols)[:, None] + self.offset_cols
+        weights = np.broadcast_to(self.weights, rows.shape)
+
+        inside = (rows >= 0) & (rows < engine.rows) & (cols >= 0) & (cols < engine.cols)
+        targets, inverse = np.unique(rows[inside] * engine.cols + cols[inside], return_inverse=True)
+        strength = np.bincount(inverse, weights=weights[inside])
+
+        if self.farm_only:
+            keep = engine.farm[targets]
+            targets, strength = targets[keep], strength[keep]
+        return targets, strength
+
+
+AREA_EFFECTS = {
+    # FertilizerFactory: +10 humidity on farmed soil in the surrounding 3x3
+    "fertilizer": AreaEffect(square_footprint(1), "humidity", 10, limit=100),
+}
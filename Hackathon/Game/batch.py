@@ -0,0 +1,177 @@
+"""Evaluate many farm strategies headlessly, in parallel, against one climate dataset.
+
+Each strategy is played for a full year on its own headless game, one per
+process, and the yearly results and daily curves are gathered into tables.
+From the ``Hackathon`` directory, like the game itself::
+
+    python Game/batch.py Game/strategies.json --environment environment_data.json --out results.csv
+
+A strategy file is a JSON list of objects like::
+
+    {
+        "name": "wheat, watered every 10s",
+        "seed": "wheat",
+        "plots": [[2, 2, 4, 3]],
+        "water_interval": 10,
+        "buildings": [["FertilizerFactory", 7, 3]]
+    }
+
+``plots`` are ``[col, row, width, height]`` areas to plow and plant,
+``water_interval`` the simulated seconds between waterings (null for never)
+and ``buildings`` ``[tag, col, row]`` placed on the first day. See
+Game/strategies.json.
+
+Strategies play by the game's rules through Game.apply_action: seeds and
+buildings are bought from the shop, so a strategy is limited by its money.
+"""
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from headless import run_headless, TICK_RATE_HELP
+from main import Game, MODE_CURSOR, MODE_DEFAULT, MODE_WATERING
+from sim_clock import TICK_RATE
+
+CURVE_FIELDS = ["strategy", "day", "money", "energy", "harvested_total", "planted_tiles", "withered_tiles"]
+RESULT_FIELDS = [
+    "strategy", "money", "energy", "harvested_total", "farmed_tiles", "planted_tiles",
+    "withered_tiles", "buildings", "mean_soil_humidity", "cpu_sec",
+]
+
+
+class Strategy:
+    """Farm decisions from one strategy definition, applied as player actions."""
+
+    def __init__(self, definition):
+        self.name = definition["name"]
+        self.seed = definition.get("seed", "wheat")
+        self.plots = [tuple(plot) for plot in definition.get("plots", [])]
+        self.water_interval = definition.get("water_interval")
+        self.buildings = [tuple(building) for building in definition.get("buildings", [])]
+        self.plot_tiles = None
+
+    def tiles(self, game):
+        if self.plot_tiles is None:
+            cols = game.engine.cols
+            self.plot_tiles = [
+                row * cols + col
+                for col0, row0, width, height in self.plots
+                for row in range(row0, min(row0 + height, game.engine.rows))
+                for col in range(col0, min(col0 + width, cols))
+            ]
+        return self.plot_tiles
+
+    def on_day(self, game, day_num):
+        if day_num == 1:
+            self.build(game)
+        game.apply_action("set_mode", MODE_DEFAULT)
+        for index in self.tiles(game):
+            game.apply_action("click_tile", index)  # plows the tile if it isn't yet
+        self.plant(game)
+
+    def build(self, game):
+        for tag, col, row in self.buildings:
+            game.apply_action("buy_item", "building", tag)
+            game.apply_action("select_item", "building", tag)
+            game.apply_action("click_tile", row * game.engine.cols + col)
+
+    def plant(self, game):
+        engine = game.engine
+        game.apply_action("set_mode", MODE_CURSOR)  # a click in watering mode would water the tile again
+        for index in self.tiles(game):
+            if engine.planted_seed[index] or engine.humidity[index] < 20:
+                continue
+            if not game.inventory.seeds.get(self.seed):
+                game.apply_action("buy_item", "seed", self.seed)
+            game.apply_action("select_item", "seed", self.seed)
+            game.apply_action("click_tile", index)
+        game.clear_placement()
+
+    def on_tick(self, game):
+        """Water every ``water_interval``; returns the ticks until the next watering (see run_headless)."""
+        if not self.water_interval:
+            return None
+        every = max(1, round(self.water_interval * game.sim_clock.tick_rate))
+        if game.sim_clock.ticks % every == 0:
+            game.apply_action("set_mode", MODE_WATERING)
+            for index in self.tiles(game):
+                if game.engine.farm[index]:
+                    game.apply_action("click_tile", index)
+            self.plant(game)  # replant harvested tiles once they're wet enough
+        return every - game.sim_clock.ticks % every
+
+
+def run_strategy(task):
+    """Worker: play one strategy for ``days`` and return its final state and daily curve."""
+    definition, environment_file, days, tick_rate, world_size = task
+    strategy = Strategy(definition)
+    game = Game(headless=True, world_size=world_size)
+    game.environment_file = environment_file
+
+    # CPU time rather than wall time: workers sharing a core would each see their wall time stretched
+    started = time.process_time()
+    final_state, daily = run_headless(days, tick_rate, game, strategy.on_day, strategy.on_tick)
+    final_state["cpu_sec"] = time.process_time() - started
+    return strategy.name, final_state, daily
+
+
+def run_batch(definitions, environment_file, days=365, tick_rate=TICK_RATE,
+              world_size=(32, 32), workers=None):
+    """Run every strategy on a process pool; returns ``[(name, final_state, daily), ...]`` in input order."""
+    tasks = [(definition, environment_file, days, tick_rate, world_size) for definition in definitions]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(run_strategy, tasks))
+
+
+def write_tables(results, out, curves_out=None):
+    with open(out, "w", newline="") as f:
+        writer = csv.DictWriter(f, RESULT_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        for name, final_state, _ in results:
+            writer.writerow(final_state | {"strategy": name})
+    if curves_out:
+        with open(curves_out, "w", newline="") as f:
+            writer = csv.DictWriter(f, CURVE_FIELDS, extrasaction="ignore")
+            writer.writeheader()
+            for name, _, daily in results:
+                for summary in daily:
+                    writer.writerow(summary | {"strategy": name})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parallel headless evaluation of farm strategies")
+    parser.add_argument("strategies", help="JSON list of strategy definitions")
+    parser.add_argument("--environment", default="environment_data.json", help="NASA POWER climate JSON")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--tick-rate", type=float, default=TICK_RATE, help=TICK_RATE_HELP)
+    parser.add_argument("--cols", type=int, default=32, help="farm width in tiles")
+    parser.add_argument("--rows", type=int, default=32, help="farm height in tiles")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--out", default="strategy_results.csv", help="one row per strategy")
+    parser.add_argument("--curves", help="also write every strategy's daily curve to this CSV")
+    args = parser.parse_args(argv)
+
+    with open(args.strategies, "r") as f:
+        definitions = json.load(f)
+
+    started = time.perf_counter()
+    results = run_batch(definitions, args.environment, args.days, args.tick_rate, (args.cols, args.rows), args.workers)
+    elapsed = time.perf_counter() - started
+    write_tables(results, args.out, args.curves)
+
+    print(f"{'strategy':<32} {'money':>8} {'energy':>8} {'harvested':>10}")
+    for name, final_state, _ in results:
+        print(f"{name:<32} {final_state['money']:>8} {final_state['energy']:>8} {final_state['harvested_total']:>10}")
+    # Run one by one, the strategies would take about as long as their summed CPU time
+    serial = sum(final_state["cpu_sec"] for _, final_state, _ in results)
+    print(f"{len(results)} strategies in {elapsed:.2f}s on {args.workers} workers "
+          f"(x{serial / elapsed:.1f} over running them one by one)")
+    print(f"Results written to {args.out}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+"""Reproducible simulation benchmarks across grid sizes and building densities.
+
+Builds synthetic farms from a fixed seed and times simulation ticks, area
+effects, save encoding and decoding (in memory, so the disk doesn't count)
+and draws under SDL's dummy video driver. Results are compared against a
+baseline file so regressions stand out; the baseline is only meaningful on
+the machine that recorded it::
+
+    python Game/benchmarks/bench_sim.py                     # run, compare with baseline.json
+    python Game/benchmarks/bench_sim.py --write-baseline    # record a new baseline
+    python Game/benchmarks/bench_sim.py --sizes 30x20 100x100 --ticks 50
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from main import Game, BUILDING_IDS
+from area_effects import AREA_EFFECTS
+from savefile import encode_save, decode_save
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+REGRESSION_THRESHOLD = 1.25  # flag results this much slower than the baseline
+NOISE_FLOOR_MS = 0.5  # ...unless they are slower by less than this, which is timer noise
+REPEATS = 7  # every timing is the best of this many runs
+
+GRID_SIZES = ["30x20", "100x100", "400x250", "1000x1000"]  # 600 to 1M tiles
+DENSITIES = {
+    # fraction of tiles farmed, of farmed tiles planted, of grass tiles with a factory
+    "sparse": (0.10, 0.50, 0.001),
+    "dense": (0.60, 0.80, 0.01),
+}
+TICK_DT = 0.05
+
+
+def build_farm(cols, rows, density, seed):
+    farm_ratio, crop_ratio, factory_ratio = DENSITIES[density]
+    rng = np.random.default_rng(seed)
+    game = Game(headless=True, world_size=(cols, rows))
+    engine = game.engine
+
+    engine.farm[:] = rng.random(engine.size) < farm_ratio
+    engine.humidity[engine.farm] = rng.uniform(20, 100, int(engine.farm.sum()))
+    planted = engine.farm & (rng.random(engine.size) < crop_ratio)
+    engine.planted_seed[planted] = engine.seed_id("wheat")
+    engine.growth_time[planted] = rng.uniform(0, 30, int(planted.sum()))
+
+    factories = np.flatnonzero(~engine.farm & (rng.random(engine.size) < factory_ratio))
+    kinds = rng.integers(1, len(BUILDING_IDS) + 1, factories.size)
+    engine.building[factories] = kinds
+    engine.building_timer[factories] = rng.uniform(0, 5, factories.size)
+    engine.reschedule_buildings()
+    return game
+
+
+def timed(fn, repeat):
+    """Best-of-``repeat`` wall time of ``fn()`` in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_case(cols, rows, density, seed, ticks):
+    tracemalloc.start()
+    game = build_farm(cols, rows, density, seed)
+    _, build_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    engine = game.engine
+
+    def run_ticks():
+        for _ in range(block):
+            game.update(TICK_DT)
+
+    block = max(1, ticks // REPEATS)  # the timed ticks are split into REPEATS runs
+    tick_sec = timed(run_ticks, REPEATS) / block
+
+    fertilizers = np.flatnonzero(engine.building == BUILDING_IDS["FertilizerFactory"])
+    effect_sec = timed(lambda: AREA_EFFECTS["fertilizer"].apply(engine, fertilizers), REPEATS)
+
+    # Encoding and decoding only: write_save's fsync would time the disk
+    data = encode_save(*game.save_state())
+    save_sec = timed(lambda: encode_save(*game.save_state()), REPEATS)
+    load_sec = timed(lambda: game.restore_state(*decode_save(data)), REPEATS)
+
+    def cold_draw():
+        game.tile_layer.invalidate()
+        engine.dirty[:] = True
+        game.draw()
+
+    draw_cold_sec = timed(cold_draw, REPEATS)  # every visible chunk re-rendered
+    draw_sec = timed(game.draw, REPEATS)  # nothing changed since the last frame
+
+    return {
+        "tiles": engine.size,
+        "factories": int(np.count_nonzero(engine.building)),
+        "tick_ms": tick_sec * 1e3,
+        "tile_updates_per_sec": engine.size / tick_sec,
+        "fertilizer_ms": effect_sec * 1e3,
+        "save_ms": save_sec * 1e3,
+        "load_ms": load_sec * 1e3,
+        "save_bytes": len(data),
+        "draw_ms": draw_sec * 1e3,
+        "draw_cold_ms": draw_cold_sec * 1e3,
+        "state_bytes": sum(column.nbytes for column in engine.snapshot_columns(copy=False).values()),
+        "build_peak_bytes": build_peak,
+    }
+
+
+def compare(results, baseline):
+    """Print each timing next to its baseline and return the list of regressions."""
+    regressions = []
+    for case, result in results.items():
+        base = baseline.get("results", {}).get(case)
+        if not base:
+            print(f"{case:<24} (no baseline)")
+            continue
+        for key in ("tick_ms", "fertilizer_ms", "save_ms", "load_ms", "draw_ms", "draw_cold_ms"):
+            ratio = result[key] / base[key] if base.get(key) else 1.0
+            flag = ""
+            if ratio > REGRESSION_THRESHOLD and result[key] - base[key] > NOISE_FLOOR_MS:
+                flag = "  <-- REGRESSION"
+                regressions.append((case, key, ratio))
+            print(f"{case:<24} {key:<14} {result[key]:10.3f} ms  baseline {base[key]:10.3f}  x{ratio:.2f}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", default=GRID_SIZES, help="grid sizes as COLSxROWS")
+    parser.add_argument("--densities", nargs="+", default=list(DENSITIES), choices=list(DENSITIES))
+    parser.add_argument("--ticks", type=int, default=100,
+                        help=f"simulation ticks timed per case, in {REPEATS} runs of which the best counts")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--write-baseline", action="store_true", help="save these results as the new baseline")
+    parser.add_argument("--out", help="also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    # One-time costs (imports, fonts, caches) would otherwise land in the first case's timings and memory peak
+    warm_up = build_farm(30, 20, "sparse", args.seed)
+    warm_up.update(TICK_DT)
+    warm_up.draw()
+
+    results = {}
+    for size in args.sizes:
+        cols, rows = (int(n) for n in size.split("x"))
+        for density in args.densities:
+            case = f"{size}/{density}"
+            results[case] = run_case(cols, rows, density, args.seed, args.ticks)
+            r = results[case]
+            print(f"{case:<24} {r['tiles']:>9,} tiles  tick {r['tick_ms']:8.3f} ms  "
+                  f"{r['tile_updates_per_sec'] / 1e6:7.1f} M tile-updates/s  "
+                  f"save {r['save_ms']:7.2f} ms  load {r['load_ms']:7.2f} ms  draw {r['draw_ms']:6.2f}/{r['draw_cold_ms']:6.2f} ms  "
+                  f"state {r['state_bytes'] / 2**20:6.1f} MiB")
+
+    report = {
+        "machine": {"python": platform.python_version(), "numpy": np.__version__, "platform": platform.platform()},
+        "settings": {"ticks": args.ticks, "seed": args.seed, "tick_dt": TICK_DT},
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=4)
+
+    if args.write_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=4)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline)
+        if regressions:
+            print(f"{len(regressions)} regression(s) over x{REGRESSION_THRESHOLD}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""Bytes per tile: the original object-per-tile grid against TileEngine with GrassTile views.
+
+The original game kept a GrassTile object per tile, each with its own
+``__dict__`` and ``pygame.Rect`` (reproduced below as LegacyGrassTile). Tiles
+now live in TileEngine's arrays, and GrassTile is a two-slot view created on
+demand::
+
+    python Game/benchmarks/bench_tile_memory.py --sizes 30x20 1000x1000
+"""
+import os
+import sys
+import argparse
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+
+from main import GrassTile, GRID_SIZE
+from tile_engine import TileEngine
+
+
+class LegacyGrassTile:
+    """Per-tile object as the game stored it before TileEngine."""
+
+    def __init__(self, x, y):
+        self.rect = pygame.Rect(x, y, GRID_SIZE, GRID_SIZE)
+        self.farm = False
+        self.humidity = 100
+        self.planted_seed = None
+        self.growth_stage = 0
+        self.growth_time = 0
+        self.withered = False
+        self.building = None
+        self.ready_to_harvest = False
+
+
+def traced_bytes(build):
+    """Bytes still allocated by ``build()`` once it returns (its result is kept alive)."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return after - before
+
+
+def measure(cols, rows):
+    size = cols * rows
+
+    def legacy():
+        tiles = []
+        for y in range(rows):
+            for x in range(cols):
+                tiles.append(LegacyGrassTile(x * GRID_SIZE, y * GRID_SIZE))
+        tiles[0].update_color = lambda: None  # attributes used to be bolted on at runtime
+        return tiles
+
+    engine = TileEngine(cols, rows, GRID_SIZE)
+    view = GrassTile(engine, 0)
+    return {
+        "legacy": traced_bytes(legacy) / size,
+        "engine": traced_bytes(lambda: TileEngine(cols, rows, GRID_SIZE)) / size,
+        # Views only exist while a tile is being clicked or redrawn
+        "view": sys.getsizeof(view),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Memory per tile, before and after TileEngine")
+    parser.add_argument("--sizes", nargs="+", default=["30x20", "128x128", "400x250"], help="grid sizes as COLSxROWS")
+    args = parser.parse_args(argv)
+
+    print(f"{'grid':<12} {'tiles':>9} {'legacy B/tile':>14} {'engine B/tile':>14} {'view B':>7} {'ratio':>7}")
+    for size in args.sizes:
+        cols, rows = (int(n) for n in size.split("x"))
+        result = measure(cols, rows)
+        print(f"{size:<12} {cols * rows:>9,} {result['legacy']:>14.1f} {result['engine']:>14.1f} "
+              f"{result['view']:>7} {result['legacy'] / result['engine']:>6.1f}x")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
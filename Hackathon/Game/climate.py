@@ -0,0 +1,56 @@
+import os
+import json
+
+import numpy as np
+
+# NASA POWER daily parameters kept from environment_data.json
+CLIMATE_FIELDS = ("T2M", "GWETTOP", "PRECTOTCORR", "ALLSKY_SFC_SW_DWN")
+NASA_FILL_VALUE = -999  # NASA POWER's marker for a missing value
+
+
+class ClimateStore:
+    """Climate dataset parsed once into a DOY-indexed array.
+
+    ``values[doy, field]`` holds the reading for day-of-year ``doy`` (1-366),
+    NaN where the file has no usable value. The file is only parsed again
+    when its modification time changes.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.mtime = None
+        self.values = np.full((367, len(CLIMATE_FIELDS)), np.nan, dtype=np.float64)
+
+    def refresh(self):
+        """Re-read the file if it changed on disk. Raises OSError/ValueError on failure."""
+        mtime = os.stat(self.filename).st_mtime
+        if mtime == self.mtime:
+            return
+        with open(self.filename, "r") as f:
+            data_list = json.load(f)
+
+        values = np.full((367, len(CLIMATE_FIELDS)), np.nan, dtype=np.float64)
+        for entry in data_list:
+            try:
+                doy = int(entry.get("DOY"))
+            except (TypeError, ValueError):
+                continue
+            if not 1 <= doy <= 366:
+                continue
+            for i, field in enumerate(CLIMATE_FIELDS):
+                try:
+                    value = float(entry.get(field))
+                except (TypeError, ValueError):
+                    continue
+                if value != NASA_FILL_VALUE:
+                    values[doy, i] = value
+
+        self.values = values
+        self.mtime = mtime
+
+    def day(self, day_of_year):
+        """``{field: value}`` for one day, or None if the day is missing from the file."""
+        row = self.values[day_of_year]
+        if np.isnan(row).all():
+            return None
+        return {field: float(row[i]) for i, field in enumerate(CLIMATE_FIELDS) if not np.isnan(row[i])}
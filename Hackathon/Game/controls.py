@@ -0,0 +1,102 @@
+from collections import namedtuple
+
+import pygame
+
+DEBOUNCE_MS = 200  # the same action repeated within this window is a bounce, not a second click
+DRAG_BUTTON = 1
+RECT_MODIFIER = pygame.KMOD_SHIFT  # held while dragging: act on the whole rectangle on release
+FILL_MODIFIER = pygame.KMOD_CTRL  # held while clicking: act on the connected area
+
+# A player action for Game.apply_action, stamped with when it was input
+InputAction = namedtuple("InputAction", ["time", "action", "args"])
+
+
+class HitTarget:
+    """A clickable area of the screen.
+
+    ``resolve(pos)`` turns a click at ``pos`` into ``(action, args)`` or None
+    (the click is swallowed). ``rect`` None covers the whole screen. With
+    ``draggable``, dragging from the target resolves every new position too.
+    ``resolve_rect(start, end)`` and ``resolve_fill(pos)``, when given, take
+    over for a drag with RECT_MODIFIER and a click with FILL_MODIFIER held.
+    """
+
+    __slots__ = ("rect", "resolve", "draggable", "resolve_rect", "resolve_fill")
+
+    def __init__(self, rect, resolve, draggable=False, resolve_rect=None, resolve_fill=None):
+        self.rect = rect
+        self.resolve = resolve
+        self.draggable = draggable
+        self.resolve_rect = resolve_rect
+        self.resolve_fill = resolve_fill
+
+
+class InputLayer:
+    """Turns raw mouse events into timestamped actions without ever blocking.
+
+    Every click is hit-tested once against the targets the game currently
+    shows, in priority order. Bounces are dropped by comparing timestamps
+    rather than sleeping, so the game loop keeps running at full rate.
+    """
+
+    def __init__(self, debounce_ms=DEBOUNCE_MS):
+        self.debounce_ms = debounce_ms
+        self.last_action = None
+        self.last_time = -debounce_ms
+        self.drag_target = None
+        # Rectangle drag in progress: its target and the screen positions it spans
+        self.rect_target = None
+        self.rect_start = None
+        self.rect_end = None
+
+    def hit_test(self, targets, pos):
+        for target in targets:
+            if target.rect is None or target.rect.collidepoint(pos):
+                return target
+        return None
+
+    def feed(self, event, get_targets, now, mods=0):
+        """Return the InputActions produced by one pygame ``event`` at ``now`` (ms).
+
+        ``get_targets()`` lists the current HitTargets; it is only called for
+        clicks and drags. ``mods`` are the keyboard modifiers held at the time.
+        """
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == DRAG_BUTTON:
+            target = self.hit_test(get_targets(), event.pos)
+            self.drag_target = None
+            if target and target.resolve_fill and mods & FILL_MODIFIER:
+                return self.emit(target.resolve_fill(event.pos), now, debounce=True)
+            if target and target.resolve_rect and mods & RECT_MODIFIER:
+                self.rect_target = target
+                self.rect_start = self.rect_end = event.pos
+                return []
+            self.drag_target = target if target and target.draggable else None
+            return self.emit(target.resolve(event.pos) if target else None, now, debounce=True)
+        if event.type == pygame.MOUSEMOTION and self.rect_target:
+            self.rect_end = event.pos
+            return []
+        if event.type == pygame.MOUSEMOTION and self.drag_target and event.buttons[DRAG_BUTTON - 1]:
+            # Over a button or panel the drag pauses rather than reaching the farm beneath it;
+            # targets are rebuilt on every call, so the drag target is recognised by its resolver
+            target = self.hit_test(get_targets(), event.pos)
+            if target is None or target.resolve != self.drag_target.resolve:
+                return []
+            # Dragging only emits when the pointer reaches something new
+            return self.emit(self.drag_target.resolve(event.pos), now, debounce=False)
+        if event.type == pygame.MOUSEBUTTONUP and event.button == DRAG_BUTTON:
+            self.drag_target = None
+            if self.rect_target:
+                target, start = self.rect_target, self.rect_start
+                self.rect_target = self.rect_start = self.rect_end = None
+                return self.emit(target.resolve_rect(start, event.pos), now, debounce=True)
+        return []
+
+    def emit(self, resolved, now, debounce):
+        if resolved is None:
+            return []
+        if resolved == self.last_action and (not debounce or now - self.last_time < self.debounce_ms):
+            return []
+        self.last_action = resolved
+        self.last_time = now
+        action, args = resolved
+        return [InputAction(now, action, args)]
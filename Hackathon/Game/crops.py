@@ -0,0 +1,76 @@
+import os
+import sys
+import json
+
+import numpy as np
+
+# Next to this module, or in the bundle's data directory in a PyInstaller build (see main.spec)
+DATA_DIR = getattr(sys, "_MEIPASS", os.path.dirname(os.path.abspath(__file__)))
+CROPS_FILE = os.path.join(DATA_DIR, "crops.json")
+
+
+class CropRegistry:
+    """Crop definitions compiled into lookup arrays indexed by crop id.
+
+    Id 0 means nothing is planted; its row never grows, withers or sells.
+    Tiles store the id, so the simulation gathers per-tile thresholds with
+    one array lookup however many crops there are.
+
+    ``temperature`` holds each crop's cardinal temperatures ``(min, low,
+    high, max)`` in °C: full speed between ``low`` and ``high``, falling off
+    linearly to no growth at ``min`` and ``max``.
+    """
+
+    def __init__(self, definitions):
+        self.tags = [None] + [crop["tag"] for crop in definitions]
+        self.ids = {tag: i for i, tag in enumerate(self.tags) if tag}
+        if len(self.ids) != len(definitions):
+            raise ValueError("Duplicate crop tag")
+
+        def column(key, empty, dtype=np.float64):
+            return np.array([empty] + [crop[key] for crop in definitions], dtype=dtype)
+
+        self.seed_price = column("seed_price", 0, np.int64)
+        self.sell_price = column("sell_price", 0, np.int64)
+        self.min_humidity = column("min_humidity", np.inf)  # grows only above this
+        self.wither_humidity = column("wither_humidity", -np.inf)  # withers at or below this
+        stage_times = np.array([[np.inf, np.inf]] + [crop["stage_times"] for crop in definitions], dtype=np.float64)
+        self.stage_1_time = stage_times[:, 0]
+        self.stage_2_time = stage_times[:, 1]
+        self.temperature = np.array([[0, 0, 0, 0]] + [crop["temperature"] for crop in definitions], dtype=np.float64)
+
+    @classmethod
+    def load(cls, filename=CROPS_FILE):
+        with open(filename, "r") as f:
+            return cls(json.load(f))
+
+    def __len__(self):
+        return len(self.tags)
+
+    def id(self, tag):
+        """Crop id of ``tag`` (0 for None). Raises ValueError for an unknown crop."""
+        if tag is None:
+            return 0
+        if tag not in self.ids:
+            raise ValueError(f"Unknown crop {tag!r}")
+        return self.ids[tag]
+
+    def shop(self):
+        """``{tag: seed price}`` for every crop, in registry order."""
+        return {tag: int(self.seed_price[i]) for tag, i in self.ids.items()}
+
+    def growth_rates(self, temperature):
+        """Growth speed multiplier of every crop id at ``temperature`` °C (0 to 1).
+
+        ``temperature`` may also be an array (e.g. one value per day); crop
+        ids are then the last axis of the result.
+        """
+        temperature = np.asarray(temperature, dtype=np.float64)[..., None]
+        t_min, low, high, t_max = self.temperature.T
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rising = (temperature - t_min) / (low - t_min)
+            falling = (t_max - temperature) / (t_max - high)
+        rates = np.clip(np.minimum(rising, falling), 0.0, 1.0)
+        rates[np.isnan(rates)] = 1.0  # low == min or high == max: a hard edge
+        rates[..., 0] = 0.0
+        return rates
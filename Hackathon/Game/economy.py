@@ -0,0 +1,88 @@
+from array import array
+
+STARTING_BALANCES = {"Money": 100, "Energy": 50}
+
+
+class TransactionLog:
+    """Append-only record of ``(tick, currency, delta, cause)`` transactions.
+
+    Currencies and causes are interned to small ids and every field lives in
+    a typed ``array``, so an entry costs 19 bytes rather than a tuple of
+    Python objects.
+    """
+
+    def __init__(self):
+        self.ticks = array("q")
+        self.currency_ids = array("B")
+        self.deltas = array("q")
+        self.cause_ids = array("H")
+        self.names = []  # id -> currency or cause name
+        self.ids = {}
+
+    def intern(self, name):
+        if name not in self.ids:
+            self.ids[name] = len(self.names)
+            self.names.append(name)
+        return self.ids[name]
+
+    def append(self, tick, currency, delta, cause):
+        self.ticks.append(tick)
+        self.currency_ids.append(self.intern(currency))
+        self.deltas.append(delta)
+        self.cause_ids.append(self.intern(cause))
+
+    def __len__(self):
+        return len(self.ticks)
+
+    def __iter__(self):
+        names = self.names
+        for tick, currency, delta, cause in zip(self.ticks, self.currency_ids, self.deltas, self.cause_ids):
+            yield tick, names[currency], delta, names[cause]
+
+    def totals(self):
+        """``{(currency, cause): net delta}`` over the whole log."""
+        totals = {}
+        for _, currency, delta, cause in self:
+            totals[currency, cause] = totals.get((currency, cause), 0) + delta
+        return totals
+
+
+class Ledger:
+    """Currency balances of one game.
+
+    Each Game owns its own Ledger, so any number of games can run in one
+    process. With ``log`` every transaction is also kept in a TransactionLog.
+    """
+
+    def __init__(self, balances=None, log=False):
+        self.balances = dict(STARTING_BALANCES if balances is None else balances)
+        self.log = TransactionLog() if log else None
+
+    def get(self, currency):
+        return self.balances.get(currency, 0)
+
+    def apply(self, transactions, tick=0):
+        """Apply a batch of ``(currency, delta, cause)`` transactions, one balance update per currency."""
+        net = {}
+        for currency, delta, cause in transactions:
+            net[currency] = net.get(currency, 0) + delta
+            if self.log is not None:
+                self.log.append(tick, currency, delta, cause)
+        for currency, delta in net.items():
+            self.balances[currency] = self.balances.get(currency, 0) + delta
+
+    def spend(self, currency, amount, cause, tick=0):
+        """Take ``amount`` if the balance covers it; returns whether it did."""
+        if self.get(currency) < amount:
+            return False
+        self.apply([(currency, -amount, cause)], tick)
+        return True
+
+    def set_balances(self, balances, cause, tick=0):
+        """Replace every balance (e.g. on load), logging the differences as ``cause``."""
+        changes = []
+        for currency in sorted(set(self.balances) | set(balances)):
+            delta = balances.get(currency, 0) - self.get(currency)
+            if delta:
+                changes.append((currency, delta, cause))
+        self.apply(changes, tick)
@@ -0,0 +1,132 @@
+"""Run the farming simulation without a window, as fast as the CPU allows.
+
+Example (from the ``Hackathon`` directory, like the game itself)::
+
+    python Game/headless.py --days 365 --out year.json
+"""
+import os
+import sys
+import json
+import math
+import time
+import csv
+import argparse
+
+# Must be set before pygame is imported by main
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import numpy as np
+
+from main import Game, DAY_LENGTH_SEC, WORLD_COLS, WORLD_ROWS
+from sim_clock import SimClock, TICK_RATE
+
+TICK_RATE_HELP = (f"simulation ticks per simulated second (default {TICK_RATE}, as in the game); "
+                  "a lower rate runs faster but its results will differ from the game's")
+
+
+def farm_summary(game):
+    engine = game.engine
+    return {
+        "day": game.last_day_num,
+        "money": game.ledger.get("Money"),
+        "energy": game.ledger.get("Energy"),
+        "farmed_tiles": int(engine.farm.sum()),
+        "planted_tiles": int(np.count_nonzero(engine.planted_seed)),
+        "withered_tiles": int(engine.withered.sum()),
+        "buildings": int(np.count_nonzero(engine.building)),
+        "mean_soil_humidity": float(engine.humidity[engine.farm].mean()) if engine.farm.any() else None,
+        "harvested_total": game.total_harvested,
+    }
+
+
+def run_headless(days=365, tick_rate=TICK_RATE, game=None, on_day=None, on_tick=None, fast_forward=True):
+    """Simulate ``days`` in-game days and return ``(final_state, daily_summaries)``.
+
+    Runs exactly ``days * DAY_LENGTH_SEC * tick_rate`` ticks. A day's summary is taken when it ends. ``on_day(game,
+    day_num)`` is called after the first tick of every new day, which is where callers can apply their own farm
+    decisions. ``on_tick(game)`` is called before the first tick and returns how many ticks later it wants to be
+    called again, or None for never. ``tick_rate`` defaults to the game's, so the outcome matches playing the same farm
+    in the window.
+
+    With ``fast_forward`` the ticks between a new day, an ``on_tick`` call and a fertilizer factory producing are
+    advanced in closed form (Game.fast_forward) instead of one by one. Crops and soil then cross their thresholds at
+    the exact moment rather than on the next tick, which is the only difference from running every tick.
+    """
+    game = game or Game(headless=True)
+    game.sim_clock = SimClock(tick_rate)
+    dt = game.sim_clock.tick_dt
+    daily = []
+
+    start = game.sim_time
+    ticks = round(days * DAY_LENGTH_SEC * tick_rate)
+    next_call = 0 if on_tick else None
+    tick = 0
+    while tick < ticks:
+        # Taken from the tick count rather than summed tick by tick, so float drift can't move a day boundary
+        game.sim_time = start + tick / tick_rate
+        day_before = game.last_day_num
+        if day_before and int(game.sim_time // DAY_LENGTH_SEC) + 1 != day_before:
+            daily.append(farm_summary(game))  # this tick starts the next day
+        if next_call is not None and tick >= next_call:
+            wait = on_tick(game)
+            next_call = None if wait is None else tick + max(1, wait)
+        game.update(dt)
+        tick += 1
+        if on_day and game.last_day_num != day_before:
+            on_day(game, game.last_day_num)
+        if fast_forward:
+            next_day = math.ceil((game.last_day_num * DAY_LENGTH_SEC - start) * tick_rate)
+            tick += game.fast_forward(min(ticks, next_day, ticks if next_call is None else next_call) - tick)
+    game.sim_time = start + ticks / tick_rate
+
+    daily.append(farm_summary(game))  # the last day, whole or cut short
+    final_state = farm_summary(game) | {
+        "sim_time": game.sim_time,
+        "ticks": game.sim_clock.ticks,
+        "inventory_seeds": dict(game.inventory.seeds),
+        "inventory_buildings": dict(game.inventory.buildings),
+        "environment": dict(game.environment),
+    }
+    return final_state, daily
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless fast-forward farm simulation")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--tick-rate", type=float, default=TICK_RATE, help=TICK_RATE_HELP)
+    parser.add_argument("--every-tick", action="store_true",
+                        help="run every tick like the game instead of fast-forwarding between events (much slower)")
+    parser.add_argument("--cols", type=int, default=WORLD_COLS, help="farm width in tiles")
+    parser.add_argument("--rows", type=int, default=WORLD_ROWS, help="farm height in tiles")
+    parser.add_argument("--load", action="store_true", help="start from the saved game")
+    parser.add_argument("--environment", default="environment_data.json", help="NASA POWER climate JSON")
+    parser.add_argument("--out", help="write final state and daily summaries to this JSON file")
+    parser.add_argument("--ledger-out", help="write every currency transaction to this CSV file")
+    args = parser.parse_args(argv)
+
+    game = Game(headless=True, world_size=(args.cols, args.rows), ledger_log=bool(args.ledger_out))
+    game.environment_file = args.environment
+    if args.load:
+        game.load_game()
+
+    started = time.perf_counter()
+    final_state, daily = run_headless(args.days, args.tick_rate, game, fast_forward=not args.every_tick)
+    elapsed = time.perf_counter() - started
+
+    print(f"Simulated {args.days} days ({final_state['ticks']} ticks) in {elapsed:.2f}s")
+    print(json.dumps(final_state, indent=4))
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"final": final_state, "daily": daily}, f, indent=4)
+        print(f"Results written to {args.out}")
+    if args.ledger_out:
+        with open(args.ledger_out, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["tick", "currency", "delta", "cause"])
+            writer.writerows(game.ledger.log)
+        print(f"{len(game.ledger.log)} transactions written to {args.ledger_out}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
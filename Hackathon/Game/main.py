@@ -1,8 +1,27 @@
 import pygame
 import time
-import json
+import math
 import os
 import random
+import argparse
+
+import numpy as np
+
+from tile_engine import TileEngine, BUILDING_TAGS, BUILDING_IDS, BUILDING_PERIODS
+from rendering import TileRaster, tile_palette, render_text, DRAW
+from world import Camera, ChunkGrid, SimulationLOD, NEAR_CHUNK_MARGIN, LOD_MIN_TILES
+from profiler import FrameProfiler
+from sim_clock import SimClock
+from climate import ClimateStore
+from weather import daily_rates, mean_rates
+from area_effects import AREA_EFFECTS
+from controls import HitTarget, InputLayer
+from economy import Ledger, STARTING_BALANCES
+from recording import InputRecorder
+from savefile import (
+    SAVE_FILE, AUTOSAVE_FILE, JOURNAL_FILE, JSON_SAVE_FILE, SaveFormatError, AutoSaver,
+    write_save, read_save, read_journal, write_json_save, read_json_save,
+)
 
 pygame.init()
 
@@ -12,6 +31,8 @@ pygame.init()
 
 WIDTH, HEIGHT = 900, 600
 GRID_SIZE = 30
+WORLD_COLS, WORLD_ROWS = 128, 128  # the farm is larger than the window; pan and zoom to see it
+CAMERA_PAN_SPEED = 600  # screen pixels per second with the arrow keys
 
 FONT_SMALL = pygame.font.Font(None, 20)
 FONT = pygame.font.Font(None, 24)
@@ -26,30 +47,70 @@ COLOR_MONEY_FACTORY = (0, 255, 255)
 COLOR_ENERGY_FACTORY = (255, 165, 0)
 COLOR_FERTILIZER_FACTORY = (128, 0, 128)
 
+TILE_PALETTE = tile_palette(
+    COLOR_GRASS,
+    COLOR_FARMED_DIRT,
+    COLOR_WATERED_DIRT,
+    COLOR_WITHERED,
+    [COLOR_MONEY_FACTORY, COLOR_ENERGY_FACTORY, COLOR_FERTILIZER_FACTORY],  # by building id
+    COLOR_PLANT_STAGE,
+)
+
+# Clickable rows of the inventory and shop panels
+PANEL_ROWS_Y = 160
+PANEL_ROW_HEIGHT = 30
+PANEL_SEEDS_X = (100, 350)
+PANEL_BUILDINGS_X = (370, 700)
+
 MODE_CURSOR = "Cursor"
 MODE_DEFAULT = "Default"
 MODE_WATERING = "Watering"
+MODE_CLEARING = "Clearing"
 
 DAY_LENGTH_SEC = 180  # Each in-game day is 5 real seconds
-
-
-class CurrencyManager:
-    currencies = {"Money": 100, "Energy": 50}
-
-    @classmethod
-    def add_currency(cls, currency, amount):
-        cls.currencies[currency] = cls.currencies.get(currency, 0) + amount
-
-    @classmethod
-    def deduct_currency(cls, currency, amount):
-        if cls.currencies.get(currency, 0) >= amount:
-            cls.currencies[currency] -= amount
-            return True
-        return False
-
-    @classmethod
-    def get_currency(cls, currency):
-        return cls.currencies.get(currency, 0)
+RENDER_FPS = 60
+IDLE_FPS = 10  # frame rate while nothing on screen changes at normal speed
+NOTIFICATION_SEC = 3
+
+# Screen areas that can be updated on their own when only they changed
+HUD_RECT = pygame.Rect(0, 0, WIDTH, 85)
+NOTIFICATION_RECT = pygame.Rect(0, HEIGHT - 40, WIDTH, 40)
+
+WATER_AMOUNT = 20  # humidity one watering adds
+PLANT_MIN_HUMIDITY = 20  # soil must be at least this wet to plant in
+# Bulk tool used by area actions (fill_rect, flood_fill) in each mode; a
+# selected seed plants instead
+AREA_TOOLS = {
+    MODE_DEFAULT: "plow",
+    MODE_WATERING: "water",
+    MODE_CLEARING: "clear",
+}
+
+# What each production cycle of a factory pays out
+FACTORY_OUTPUT = {
+    "MoneyFactory": ("Money", 5),
+    "EnergyFactory": ("Energy", 10),
+}
+
+# Game methods a player action may call through Game.apply_action (and so
+# the only ones an input recording can contain)
+ACTIONS = (
+    "set_mode",
+    "toggle_inventory",
+    "toggle_shop",
+    "toggle_info",
+    "select_item",
+    "buy_item",
+    "click_tile",
+    "fill_rect",
+    "flood_fill",
+)
+MODE_MESSAGES = {
+    MODE_CURSOR: "Switched to Cursor mode",
+    MODE_DEFAULT: "Switched to Default mode (Plow)",
+    MODE_WATERING: "Switched to Watering mode",
+    MODE_CLEARING: "Switched to Clearing mode",
+}
 
 
 class Inventory:
@@ -63,9 +124,9 @@ class Inventory:
     def add_building(self, building_tag, amount=1):
         self.buildings[building_tag] = self.buildings.get(building_tag, 0) + amount
 
-    def use_seed(self, seed_tag):
-        if self.seeds.get(seed_tag, 0) > 0:
-            self.seeds[seed_tag] -= 1
+    def use_seed(self, seed_tag, amount=1):
+        if self.seeds.get(seed_tag, 0) >= amount:
+            self.seeds[seed_tag] -= amount
             if self.seeds[seed_tag] == 0:
                 del self.seeds[seed_tag]
             return True
@@ -81,80 +142,123 @@ class Inventory:
 
 
 class GrassTile:
-    def __init__(self, x, y):
-        self.rect = pygame.Rect(x, y, GRID_SIZE, GRID_SIZE)
-        self.farm = False
-        self.humidity = 100
-        self.planted_seed = None
-        self.growth_stage = 0
-        self.growth_time = 0
-        self.withered = False
-        self.building = None
-        self.ready_to_harvest = False
-
-    def update(self, dt, environment):
-        if self.farm and not self.building:
-            dry_rate = 5 * dt
-            self.humidity = max(0, self.humidity - dry_rate)
-            if self.humidity == 0 and self.planted_seed and not self.withered:
-                self.withered = True
-
-        old_stage = self.growth_stage
-        if self.planted_seed and not self.withered and self.humidity > 20:
-            self.growth_time += dt
-            if self.growth_time > 30:
-                self.growth_stage = 2
-            elif self.growth_time > 15:
-                self.growth_stage = 1
-
-        if old_stage < 2 and self.growth_stage == 2:
-            self.ready_to_harvest = True
-
-    def draw(self, surface):
-        if self.building:
-            color = {
-                "MoneyFactory": COLOR_MONEY_FACTORY,
-                "EnergyFactory": COLOR_ENERGY_FACTORY,
-                "FertilizerFactory": COLOR_FERTILIZER_FACTORY
-            }.get(self.building, (255, 255, 255))
-        elif self.farm:
-            if self.withered:
-                color = COLOR_WITHERED
-            elif self.planted_seed:
-                base = COLOR_PLANT_STAGE[self.growth_stage]
-                brightness_factor = max(0.4, self.humidity / 100)
-                color = tuple(min(255, int(c * brightness_factor)) for c in base)
-            elif self.humidity < 30:
-                color = COLOR_WATERED_DIRT
-            else:
-                color = COLOR_FARMED_DIRT
-        else:
-            color = COLOR_GRASS
-
-        pygame.draw.rect(surface, color, self.rect)
-        pygame.draw.rect(surface, (50, 50, 50), self.rect, 1)
+    """View onto one tile's state in the game's TileEngine arrays.
+
+    Only the engine and the tile's row-major grid index are stored; every
+    other field, the rect included, is read from the engine when asked for.
+    """
+
+    __slots__ = ("engine", "index")
+
+    def __init__(self, engine, index):
+        self.engine = engine
+        self.index = index
+
+    @property
+    def col(self):
+        return self.index % self.engine.cols
+
+    @property
+    def row(self):
+        return self.index // self.engine.cols
+
+    @property
+    def rect(self):
+        return pygame.Rect(self.col * GRID_SIZE, self.row * GRID_SIZE, GRID_SIZE, GRID_SIZE)
+
+    @property
+    def farm(self):
+        return bool(self.engine.farm[self.index])
+
+    @farm.setter
+    def farm(self, value):
+        self.engine.dirty[self.index] = True
+        self.engine.farm[self.index] = value
+
+    @property
+    def humidity(self):
+        return float(self.engine.humidity[self.index])
+
+    @humidity.setter
+    def humidity(self, value):
+        self.engine.dirty[self.index] = True
+        self.engine.humidity[self.index] = value
+
+    @property
+    def planted_seed(self):
+        return self.engine.seed_tags[self.engine.planted_seed[self.index]]
+
+    @planted_seed.setter
+    def planted_seed(self, seed_tag):
+        self.engine.dirty[self.index] = True
+        self.engine.planted_seed[self.index] = self.engine.seed_id(seed_tag)
+
+    @property
+    def growth_stage(self):
+        return int(self.engine.growth_stage[self.index])
+
+    @growth_stage.setter
+    def growth_stage(self, value):
+        self.engine.dirty[self.index] = True
+        self.engine.growth_stage[self.index] = value
+
+    @property
+    def growth_time(self):
+        return float(self.engine.growth_time[self.index])
+
+    @growth_time.setter
+    def growth_time(self, value):
+        self.engine.dirty[self.index] = True
+        self.engine.growth_time[self.index] = value
+
+    @property
+    def withered(self):
+        return bool(self.engine.withered[self.index])
+
+    @withered.setter
+    def withered(self, value):
+        self.engine.dirty[self.index] = True
+        self.engine.withered[self.index] = value
+
+    @property
+    def building(self):
+        return BUILDING_TAGS[self.engine.building[self.index]]
+
+    @building.setter
+    def building(self, building_tag):
+        self.engine.dirty[self.index] = True
+        self.engine.set_building(self.index, BUILDING_IDS[building_tag] if building_tag else 0)
+
+    @property
+    def building_timer(self):
+        """Seconds into the building's current production cycle."""
+        engine = self.engine
+        building = engine.building[self.index]
+        if not building:
+            return 0.0
+        return float(engine.time - (engine.building_due[self.index] - BUILDING_PERIODS[building]))
 
 
 class Button:
-    def __init__(self, rect, text, callback):
+    """Top-bar button that performs the player action ``action`` (see Game.apply_action) when clicked."""
+
+    def __init__(self, rect, text, action, *args):
         self.rect = pygame.Rect(rect)
         self.text = text
-        self.callback = callback
+        self.action = (action, args)
         self.font = FONT
 
-    def update(self, mouse_pos, mouse_pressed):
-        self.is_hover = self.rect.collidepoint(mouse_pos)
-        if self.is_hover and mouse_pressed[0]:
-            self.callback()
+    def target(self):
+        return HitTarget(self.rect, lambda pos: self.action)
 
     def draw(self, surface):
         base_color = (70, 70, 70)
         hover_color = (100, 150, 100)
-        color = hover_color if getattr(self, "is_hover", False) else base_color
-        pygame.draw.rect(surface, color, self.rect, border_radius=5)
-        txt_surf = self.font.render(self.text, True, (255, 255, 255))
+        color = hover_color if self.rect.collidepoint(pygame.mouse.get_pos()) else base_color
+        DRAW.rect(surface, color, self.rect, border_radius=5)
+        txt_surf = render_text(self.font, self.text, (255, 255, 255))
         txt_rect = txt_surf.get_rect(center=self.rect.center)
-        surface.blit(txt_surf, txt_rect)
+        DRAW.blit(surface, txt_surf, txt_rect)
 
 
 class ScrollableList:
@@ -166,8 +270,6 @@ class ScrollableList:
         self.items = []
         self.scroll_offset = 0
         self.max_visible_items = max((self.rect.height - 10) // 30, 1)
-        self.last_click_time = 0
-        self.click_delay = 300  # milliseconds
 
     def add_item(self, label, callback):
         self.items.append((label, callback))
@@ -177,7 +279,7 @@ class ScrollableList:
         self.scroll_offset = 0
 
     def draw(self, surface):
-        pygame.draw.rect(surface, self.bg_color, self.rect, border_radius=5)
+        DRAW.rect(surface, self.bg_color, self.rect, border_radius=5)
         y = self.rect.y + 5
         visible = self.items[
             self.scroll_offset : self.scroll_offset + self.max_visible_items
@@ -186,42 +288,42 @@ class ScrollableList:
         for label, _ in visible:
             item_rect = pygame.Rect(self.rect.x + 5, y, self.rect.width - 10, 25)
             if item_rect.collidepoint(mouse_pos):
-                pygame.draw.rect(surface, (70, 110, 70), item_rect)
-            txt = self.font.render(label, True, self.fg_color)
-            surface.blit(txt, (item_rect.x + 5, item_rect.y + 3))
+                DRAW.rect(surface, (70, 110, 70), item_rect)
+            txt = render_text(self.font, label, self.fg_color)
+            DRAW.blit(surface, txt, (item_rect.x + 5, item_rect.y + 3))
             y += 30
 
-    def update(self, mouse_pos, mouse_pressed):
-        if mouse_pressed[0]:
-            now = pygame.time.get_ticks()
-            if now - self.last_click_time < self.click_delay:
-                return  # debounce
-            y = self.rect.y + 5
-            for idx in range(
-                self.scroll_offset,
-                min(len(self.items), self.scroll_offset + self.max_visible_items),
-            ):
-                label, callback = self.items[idx]
-                item_rect = pygame.Rect(self.rect.x + 5, y, self.rect.width - 10, 25)
-                if item_rect.collidepoint(mouse_pos):
-                    callback()
-                    self.last_click_time = now
-                    break
-                y += 30
-
 
 class Game:
-    def __init__(self):
-        self.win = pygame.display.set_mode((WIDTH, HEIGHT))
-        pygame.display.set_caption("Farming Game")
+    def __init__(self, headless=False, world_size=(WORLD_COLS, WORLD_ROWS), ledger_log=False):
+        self.headless = headless
+        if headless:
+            # No window: draw() still works, but onto an off-screen surface
+            self.win = pygame.Surface((WIDTH, HEIGHT))
+        else:
+            self.win = pygame.display.set_mode((WIDTH, HEIGHT))
+            pygame.display.set_caption("Farming Game")
         self.clock = pygame.time.Clock()
+        self.sim_clock = SimClock()
+        self.autosaver = None  # started by run(); headless games save synchronously
+        self.profiler = FrameProfiler()
+        self.show_profiler = False
+        self.profile_out = None  # JSON-lines file the profiler is dumped to on exit
+        self.recorder = None  # InputRecorder that apply_action logs to, if recording
         self.running = True
 
-        self.tiles = [GrassTile(x, y) for y in range(0, HEIGHT, GRID_SIZE) for x in range(0, WIDTH, GRID_SIZE)]
+        self.engine = TileEngine(world_size[0], world_size[1], GRID_SIZE)
+        self.chunks = ChunkGrid(self.engine)
+        self.camera = Camera((WIDTH, HEIGHT), (world_size[0] * GRID_SIZE, world_size[1] * GRID_SIZE))
+        self.tile_layer = TileRaster(self.engine, TILE_PALETTE)
+        # Headless runs and small maps simulate every tile every tick; the
+        # window trades fidelity far from the camera for speed on large maps
+        self.lod = None if headless or self.engine.size < LOD_MIN_TILES else SimulationLOD(self.chunks)
 
         self.inventory = Inventory()
+        self.ledger = Ledger(log=ledger_log)
 
-        self.seeds_shop = {"wheat": 5}
+        self.seeds_shop = self.engine.crops.shop()  # seed prices come from crops.json
         self.buildings_shop = {
             "MoneyFactory": 70,
             "EnergyFactory": 50,
@@ -233,15 +335,54 @@ class Game:
 
         self.mode = MODE_CURSOR
 
-        self.start_time = time.time()
+        self.notification = ""
+        self.notification_time = 0
+
+        # Simulated seconds since the farm was started, advanced only by update()
+        self.sim_time = 0.0
         self.last_day_num = 0
+        self.total_harvested = 0
 
         self.environment = {
             "temperature": 20,
             "humidity": 50,
             "soil_moisture": 100,
+            "precipitation": 0,
         }
+        self.environment_file = "environment_data.json"
+        self.climate = None  # ClimateStore, opened on the first daily update
+
+        self.cursor_img_building = None
+        self.cursor_img_seeding = None
+        if not headless:
+            self.load_cursor_images()
+
+        self.buttons = []
+        self.buttons.append(Button((10, 10, 100, 40), "Inventory", "toggle_inventory"))
+        self.buttons.append(Button((120, 10, 100, 40), "Shop", "toggle_shop"))
+        self.buttons.append(Button((230, 10, 100, 40), "Info", "toggle_info"))
+
+        self.buttons.append(Button((WIDTH - 380, 10, 90, 40), "Cursor", "set_mode", MODE_CURSOR))
+        self.buttons.append(Button((WIDTH - 285, 10, 90, 40), "Default", "set_mode", MODE_DEFAULT))
+        self.buttons.append(Button((WIDTH - 190, 10, 90, 40), "Watering", "set_mode", MODE_WATERING))
+        self.buttons.append(Button((WIDTH - 95, 10, 90, 40), "Clearing", "set_mode", MODE_CLEARING))
+        self.input = InputLayer()
+        self.shown_state = None  # screen_state() of the frame on the display
+        self.redraw_all = True  # set when the window needs a full repaint regardless
+
+        self.show_inventory = False
+        self.show_shop = False
+        self.show_info = False
+
+        inv_panel_w, inv_panel_h = 700, 400
+        inv_x, inv_y = 100, 100
 
+        self.inventory_list_seeds = ScrollableList((inv_x + 20, inv_y + 70, (inv_panel_w // 2) - 40, inv_panel_h - 100), FONT_SMALL)
+        self.inventory_list_buildings = ScrollableList((inv_x + (inv_panel_w // 2) + 20, inv_y + 70, (inv_panel_w // 2) - 40, inv_panel_h - 100), FONT_SMALL)
+        self.shop_list_seeds = ScrollableList((inv_x + 20, inv_y + 70, (inv_panel_w // 2) - 40, inv_panel_h - 100), FONT_SMALL)
+        self.shop_list_buildings = ScrollableList((inv_x + (inv_panel_w // 2) + 20, inv_y + 70, (inv_panel_w // 2) - 40, inv_panel_h - 100), FONT_SMALL)
+
+    def load_cursor_images(self):
         try:
             # Load hammer cursor image
             hammer_img = pygame.image.load("Game/Assets/hammer.png").convert_alpha()
@@ -260,44 +401,29 @@ class Game:
             self.cursor_img_building = None
             self.cursor_img_seeding = None
 
-        self.buttons = []
-        self.buttons.append(Button((10, 10, 100, 40), "Inventory", self.toggle_inventory))
-        self.buttons.append(Button((120, 10, 100, 40), "Shop", self.toggle_shop))
-        self.buttons.append(Button((230, 10, 100, 40), "Info", self.toggle_info))
-
-        self.buttons.append(Button((WIDTH - 460, 10, 130, 40), "Cursor", self.set_mode_cursor))
-        self.buttons.append(Button((WIDTH - 310, 10, 130, 40), "Default", self.set_mode_default))
-        self.buttons.append(Button((WIDTH - 160, 10, 130, 40), "Watering", self.set_mode_watering))
-
-        self.show_inventory = False
-        self.show_shop = False
-        self.show_info = False
-
-        inv_panel_w, inv_panel_h = 700, 400
-        inv_x, inv_y = 100, 100
-
-        self.inventory_list_seeds = ScrollableList((inv_x + 20, inv_y + 70, (inv_panel_w // 2) - 40, inv_panel_h - 100), FONT_SMALL)
-        self.inventory_list_buildings = ScrollableList((inv_x + (inv_panel_w // 2) + 20, inv_y + 70, (inv_panel_w // 2) - 40, inv_panel_h - 100), FONT_SMALL)
-        self.shop_list_seeds = ScrollableList((inv_x + 20, inv_y + 70, (inv_panel_w // 2) - 40, inv_panel_h - 100), FONT_SMALL)
-        self.shop_list_buildings = ScrollableList((inv_x + (inv_panel_w // 2) + 20, inv_y + 70, (inv_panel_w // 2) - 40, inv_panel_h - 100), FONT_SMALL)
-
     def post_notification(self, text):
         self.notification = text
         self.notification_time = time.time()
 
-    def set_mode_cursor(self):
-        self.mode = MODE_CURSOR
-        self.post_notification("Switched to Cursor mode")
-        self.clear_placement()
-
-    def set_mode_default(self):
-        self.mode = MODE_DEFAULT
-        self.post_notification("Switched to Default mode (Plow)")
-        self.clear_placement()
+    # -------------------
+    # Player actions
+    # -------------------
 
-    def set_mode_watering(self):
-        self.mode = MODE_WATERING
-        self.post_notification("Switched to Watering mode")
+    def apply_action(self, action, *args):
+        """Run the player action ``action`` (one of ACTIONS) with ``args``.
+
+        All input that changes the game goes through here, stamped with the
+        simulation tick it happened on, so it can be recorded and replayed.
+        """
+        if action not in ACTIONS:
+            raise ValueError(f"Unknown action {action!r}")
+        if self.recorder:
+            self.recorder.record(self.sim_clock.ticks, action, args)
+        getattr(self, action)(*args)
+
+    def set_mode(self, mode):
+        self.mode = mode
+        self.post_notification(MODE_MESSAGES[mode])
         self.clear_placement()
 
     def toggle_inventory(self):
@@ -330,61 +456,73 @@ class Game:
         self.placing_item_type = None
         self.placing_item_tag = None
 
+    def select_item(self, item_type, tag):
+        """Pick a seed or building from the inventory for placing on the next tile click."""
+        self.placing_item_type = item_type
+        self.placing_item_tag = tag
+        self.show_inventory = False
+        if item_type == "seed":
+            self.post_notification(f"Selected seed '{tag}' for planting")
+        else:
+            self.post_notification(f"Selected building '{tag}' for placement")
+
+    def buy_item(self, item_type, tag):
+        if item_type == "seed":
+            price = self.seeds_shop[tag]
+        else:
+            price = self.buildings_shop[tag]
+        if self.ledger.spend("Money", price, f"buy {tag}", self.sim_clock.ticks):
+            if item_type == "seed":
+                self.inventory.add_seed(tag, 1)
+            else:
+                self.inventory.add_building(tag, 1)
+            self.post_notification(f"Bought {item_type} {tag} for ${price}")
+        else:
+            self.post_notification("Not enough money!")
+
     def update_inventory_lists(self):
         self.inventory_list_seeds.clear()
         self.inventory_list_buildings.clear()
         for seed, count in sorted(self.inventory.seeds.items()):
             def on_select(s=seed):
-                self.placing_item_type = "seed"
-                self.placing_item_tag = s
-                self.show_inventory = False
-                self.post_notification(f"Selected seed '{s}' for planting")
+                self.apply_action("select_item", "seed", s)
             self.inventory_list_seeds.add_item(f"{seed} (x{count})", on_select)
         for bld, count in sorted(self.inventory.buildings.items()):
             def on_select(b=bld):
-                self.placing_item_type = "building"
-                self.placing_item_tag = b
-                self.show_inventory = False
-                self.post_notification(f"Selected building '{b}' for placement")
+                self.apply_action("select_item", "building", b)
             self.inventory_list_buildings.add_item(f"{bld} (x{count})", on_select)
 
     def update_shop_lists(self):
         self.shop_list_seeds.clear()
         self.shop_list_buildings.clear()
         for seed, price in self.seeds_shop.items():
-            def on_buy(s=seed, p=price):
-                if CurrencyManager.deduct_currency("Money", p):
-                    self.inventory.add_seed(s, 1)
-                    self.post_notification(f"Bought seed {s} for ${p}")
-                else:
-                    self.post_notification("Not enough money!")
+            def on_buy(s=seed):
+                self.apply_action("buy_item", "seed", s)
             self.shop_list_seeds.add_item(f"{seed} - ${price}", on_buy)
         for bld, price in self.buildings_shop.items():
-            def on_buy(b=bld, p=price):
-                if CurrencyManager.deduct_currency("Money", p):
-                    self.inventory.add_building(b, 1)
-                    self.post_notification(f"Bought building {b} for ${p}")
-                else:
-                    self.post_notification("Not enough money!")
+            def on_buy(b=bld):
+                self.apply_action("buy_item", "building", b)
             self.shop_list_buildings.add_item(f"{bld} - ${price}", on_buy)
 
-    def load_environment_from_json(self, filename="environment_data.json"):
+    def load_environment_from_json(self, filename=None):
+        filename = filename or self.environment_file
         if not os.path.exists(filename):
             self.post_notification(f"Environment file '{filename}' not found!")
             return
 
+        if self.climate is None or self.climate.filename != filename:
+            self.climate = ClimateStore(filename)
         try:
-            with open(filename, "r") as f:
-                data_list = json.load(f)
+            self.climate.refresh()
         except Exception as e:
             self.post_notification(f"Failed to load environment JSON: {e}")
             return
 
-        elapsed_seconds = time.time() - self.start_time
+        elapsed_seconds = self.sim_time
         elapsed_days = int(elapsed_seconds // DAY_LENGTH_SEC)  # integer number of days passed
         day_of_year = (elapsed_days % 365) + 1  # 1-based day of year
 
-        doy_entry = next((entry for entry in data_list if entry.get("DOY") == day_of_year), None)
+        doy_entry = self.climate.day(day_of_year)
 
         if doy_entry is None:
             self.post_notification(f"No environment data found for day {day_of_year}")
@@ -393,61 +531,213 @@ class Game:
         self.environment["temperature"] = float(doy_entry.get("T2M", self.environment.get("temperature", 20)))
 
         gwet = doy_entry.get("GWETTOP", 0.5)
-        if isinstance(gwet, str):
-            try:
-                gwet = float(gwet)
-            except:
-                gwet = 0.5
         self.environment["soil_moisture"] = max(0, min(100, gwet * 100))
 
         self.environment["humidity"] = 50  # default or computed elsewhere
+        self.environment["precipitation"] = doy_entry.get("PRECTOTCORR", 0.0)
+
+        # The day's weather sets how fast soil dries and crops grow
+        dry_rate, growth_rate = daily_rates(self.climate.values[day_of_year], self.engine.crops)
+        self.engine.dry_rate = float(dry_rate)
+        self.engine.growth_rate = growth_rate
 
         self.post_notification(f"Environment updated for day {day_of_year}")
-    def save_game(self):
-        data = {
-            "tiles": [{
-                "pos": (tile.rect.x, tile.rect.y),
-                "farm": tile.farm,
-                "humidity": tile.humidity,
-                "planted_seed": tile.planted_seed,
-                "growth_stage": tile.growth_stage,
-                "growth_time": tile.growth_time,
-                "withered": tile.withered,
-                "building": tile.building
-            } for tile in self.tiles],
-            "inventory_seeds": self.inventory.seeds,
-            "inventory_buildings": self.inventory.buildings,
-            "currencies": CurrencyManager.currencies,
-            "start_time": self.start_time,
-            "environment": self.environment
+    # -------------------
+    # Save / load
+    # -------------------
+
+    def save_meta(self):
+        """Everything in a save except the tiles."""
+        return {
+            "inventory_seeds": dict(self.inventory.seeds),
+            "inventory_buildings": dict(self.inventory.buildings),
+            "currencies": dict(self.ledger.balances),
+            "start_time": time.time() - self.sim_time,
+            "sim_time": self.sim_time,
+            "production_time": self.engine.time,
+            "saved_at": time.time(),
+            "environment": dict(self.environment),
+            "cols": self.engine.cols,
+            "rows": self.engine.rows,
+            "seed_tags": list(self.engine.seed_tags),
         }
-        with open("savegame.json", "w") as f:
-            json.dump(data, f, indent=4)
+
+    def save_state(self):
+        """Current game as ``(meta, tiles)`` for the savefile writers."""
+        return self.save_meta(), self.engine.export_tiles()
+
+    def restore_state(self, meta, tiles, reset=True):
+        self.engine.import_tiles(tiles, meta["cols"], meta["seed_tags"], reset, meta.get("production_time"))
+        self.inventory.seeds = meta.get("inventory_seeds", {})
+        self.inventory.buildings = meta.get("inventory_buildings", {})
+        self.ledger.set_balances(meta.get("currencies", STARTING_BALANCES), "load", self.sim_clock.ticks)
+        if "sim_time" in meta:
+            self.sim_time = meta["sim_time"]
+        else:
+            # Older saves only know when the farm was started: the clock
+            # stands where it was when the save was written, and catch_up
+            # simulates the time since
+            saved_at = meta.get("saved_at", time.time())
+            self.sim_time = saved_at - meta.get("start_time", saved_at)
+        self.environment = meta.get("environment", self.environment)
+
+    def catch_up(self, meta):
+        """Simulate the time since the save in ``meta`` was written, in closed form.
+
+        Crops, soil and factories jump straight to their state ``elapsed``
+        seconds later (TileEngine.catch_up), so even a month away loads at
+        once. Returns a summary for the player after a real absence, else None.
+        """
+        elapsed = time.time() - meta["saved_at"] if "saved_at" in meta else 0
+        if elapsed <= 0:
+            return None
+        engine = self.engine
+        transactions = []
+
+        # Fertilizer keeps adding humidity around it at an average rate
+        fertilizer = BUILDING_IDS["FertilizerFactory"]
+        sources = np.flatnonzero(engine.building == fertilizer)
+        gain = AREA_EFFECTS["fertilizer"].field(engine, sources) / BUILDING_PERIODS[fertilizer]
+
+        dry_rate, growth_rate = self.mean_weather(self.sim_time, elapsed)
+        harvested, seed_ids = engine.catch_up(elapsed, gain, dry_rate, growth_rate)
+        if harvested.size:
+            self.total_harvested += harvested.size
+            transactions.append(("Money", self.harvest_income(seed_ids), "harvest"))
+
+        produced, cycles = engine.catch_up_buildings(elapsed)
+        counts = np.bincount(engine.building[produced], weights=cycles, minlength=len(BUILDING_TAGS))
+        self.factory_income(counts, transactions)
+
+        self.ledger.apply(transactions, self.sim_clock.ticks)
+        self.sim_time += elapsed
+        money = sum(delta for currency, delta, _ in transactions if currency == "Money")
+        if elapsed < 60:
+            return None
+        if elapsed < 3600:
+            away = f"{elapsed / 60:.0f} min"
+        elif elapsed < 2 * 86400:
+            away = f"{elapsed / 3600:.1f} h"
+        else:
+            away = f"{elapsed / 86400:.0f} days"
+        return f"{away} away: {harvested.size} crops harvested, +${money}"
+
+    def fast_forward(self, max_ticks):
+        """Advance up to ``max_ticks`` ticks in closed form; returns how many were advanced.
+
+        Stops short of the tick in which the next fertilizer factory produces,
+        whose humidity boost has to land at that moment, so update() runs it.
+        Meant for stretches with no input and no new day, e.g. between the
+        decisions of a headless strategy: the tiles follow TileEngine.catch_up
+        and factories are paid for every cycle they complete, in one ledger
+        entry per currency.
+        """
+        engine = self.engine
+        dt = self.sim_clock.tick_dt
+        fertilizer = BUILDING_IDS["FertilizerFactory"]
+        due = engine.building_due[engine.building == fertilizer]
+        if due.size:
+            max_ticks = min(max_ticks, math.ceil((due.min() - engine.time) / dt) - 1)
+        if max_ticks <= 0:
+            return 0
+        elapsed = max_ticks * dt
+        transactions = []
+
+        harvested, seed_ids = engine.catch_up(elapsed)
+        if harvested.size:
+            self.total_harvested += harvested.size
+            transactions.append(("Money", self.harvest_income(seed_ids), "harvest"))
+
+        produced, cycles = engine.catch_up_buildings(elapsed)
+        counts = np.bincount(engine.building[produced], weights=cycles, minlength=len(BUILDING_TAGS))
+        self.factory_income(counts, transactions)
+        # Float rounding can let a fertilizer factory come due at the very end
+        fertilizers = produced[engine.building[produced] == fertilizer]
+        if fertilizers.size:
+            AREA_EFFECTS["fertilizer"].apply(engine, fertilizers)
+
+        self.ledger.apply(transactions, self.sim_clock.ticks)
+        self.sim_time += elapsed
+        self.sim_clock.ticks += max_ticks
+        return max_ticks
+
+    def mean_weather(self, start, elapsed):
+        """Average ``(dry_rate, growth_rate)`` over ``elapsed`` simulated seconds from ``start``.
+
+        Each day of the climate data counts for the time spent in it, so a
+        long absence sees the seasons it covered. Without climate data the
+        engine's current rates are returned.
+        """
+        if self.climate is None:
+            return self.engine.dry_rate, self.engine.growth_rate
+        days = np.arange(int(start // DAY_LENGTH_SEC), int((start + elapsed) // DAY_LENGTH_SEC) + 1)
+        seconds = (np.minimum((days + 1) * DAY_LENGTH_SEC, start + elapsed)
+                   - np.maximum(days * DAY_LENGTH_SEC, start))
+        weights = np.bincount(days % 365 + 1, weights=seconds, minlength=len(self.climate.values))
+        return mean_rates(self.climate.values, weights, self.engine.crops)
+
+    def save_game(self):
+        if self.autosaver:
+            # Written by the autosave worker, which posts "Game saved!" when done
+            self.autosaver.save_copy(self, SAVE_FILE)
+            return
+        write_save(SAVE_FILE, *self.save_state())
         self.post_notification("Game saved!")
 
+    def load_autosave(self):
+        if not os.path.exists(AUTOSAVE_FILE):
+            self.post_notification("No autosave found!")
+            return
+        try:
+            meta, tiles = read_save(AUTOSAVE_FILE)
+            self.restore_state(meta, tiles)
+            # Replay the changes journaled since that snapshot
+            for meta, tiles in read_journal(JOURNAL_FILE, meta.get("generation")):
+                self.restore_state(meta, tiles, reset=False)
+        except (SaveFormatError, ValueError, KeyError) as e:
+            self.post_notification(f"Failed to load autosave: {e}")
+            return
+        away = self.catch_up(meta)
+        if self.autosaver:
+            self.autosaver.reset()
+        self.post_notification(f"Autosave loaded! {away}" if away else "Autosave loaded!")
+
     def load_game(self):
-        if not os.path.exists("savegame.json"):
+        # Older games only have the JSON save
+        if os.path.exists(SAVE_FILE):
+            loader = lambda: read_save(SAVE_FILE)
+        elif os.path.exists(JSON_SAVE_FILE):
+            loader = lambda: read_json_save(JSON_SAVE_FILE, self.engine.cols, GRID_SIZE, BUILDING_IDS)
+        else:
             self.post_notification("Save file not found!")
             return
-        with open("savegame.json", "r") as f:
-            data = json.load(f)
-        pos_to_tile = {(t.rect.x, t.rect.y): t for t in self.tiles}
-        for tdata in data.get("tiles", []):
-            tile = pos_to_tile.get(tuple(tdata["pos"]))
-            if tile:
-                tile.farm = tdata.get("farm", False)
-                tile.humidity = tdata.get("humidity", 100)
-                tile.planted_seed = tdata.get("planted_seed", None)
-                tile.growth_stage = tdata.get("growth_stage", 0)
-                tile.growth_time = tdata.get("growth_time", 0)
-                tile.withered = tdata.get("withered", False)
-                tile.building = tdata.get("building", None)
-        self.inventory.seeds = data.get("inventory_seeds", {})
-        self.inventory.buildings = data.get("inventory_buildings", {})
-        CurrencyManager.currencies = data.get("currencies", {"Money":100, "Energy":50})
-        self.start_time = data.get("start_time", time.time())
-        self.environment = data.get("environment", self.environment)
-        self.post_notification("Game loaded!")
+        try:
+            meta, tiles = loader()
+            self.restore_state(meta, tiles)
+        except (SaveFormatError, ValueError, KeyError) as e:
+            self.post_notification(f"Failed to load save: {e}")
+            return
+        away = self.catch_up(meta)
+        if self.autosaver:
+            self.autosaver.reset()
+        self.post_notification(f"Game loaded! {away}" if away else "Game loaded!")
+
+    def export_json(self):
+        write_json_save(JSON_SAVE_FILE, *self.save_state(), GRID_SIZE, BUILDING_TAGS)
+        self.post_notification(f"Exported game to {JSON_SAVE_FILE}")
+
+    def import_json(self):
+        if not os.path.exists(JSON_SAVE_FILE):
+            self.post_notification(f"{JSON_SAVE_FILE} not found!")
+            return
+        try:
+            self.restore_state(*read_json_save(JSON_SAVE_FILE, self.engine.cols, GRID_SIZE, BUILDING_IDS))
+        except (SaveFormatError, ValueError, KeyError) as e:
+            self.post_notification(f"Failed to import {JSON_SAVE_FILE}: {e}")
+            return
+        if self.autosaver:
+            self.autosaver.reset()
+        self.post_notification(f"Imported game from {JSON_SAVE_FILE}")
 
     # -------------------
     # Daily update
@@ -466,129 +756,104 @@ class Game:
             if event.type == pygame.QUIT:
                 self.running = False
 
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                self.redraw_all = True
+
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     self.running = False
                 elif event.key == pygame.K_s:
                     self.save_game()
                 elif event.key == pygame.K_l:
-                    self.load_game()
-
-            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                pos = event.pos
-
-                # Check if any top button is clicked and call its callback
-                for btn in self.buttons:
-                    if btn.rect.collidepoint(pos):
-                        btn.callback()
-                        break
-                else:
-                    # If no buttons clicked, handle panel item clicks or game tile clicks
-
-                    # Inventory panel clicks to select seeds or buildings
-                    if self.show_inventory:
-                        inv_x_start = 100
-                        inv_x_end = 350
-                        seeds_start_y = 160
-
-                        if inv_x_start <= pos[0] <= inv_x_end:
-                            idx = (pos[1] - seeds_start_y) // 30
-                            seeds_list = list(self.inventory.seeds.items())
-                            if 0 <= idx < len(seeds_list):
-                                seed, _ = seeds_list[idx]
-                                self.placing_item_type = "seed"
-                                self.placing_item_tag = seed
-                                self.show_inventory = False
-                                self.post_notification(f"Selected seed '{seed}' for planting")
-                                pygame.time.wait(200)
-                                continue
-
-                        bld_x_start = 370
-                        bld_x_end = 700
-                        buildings_start_y = 160
-
-                        if bld_x_start <= pos[0] <= bld_x_end:
-                            idx = (pos[1] - buildings_start_y) // 30
-                            buildings_list = list(self.inventory.buildings.items())
-                            if 0 <= idx < len(buildings_list):
-                                bld, _ = buildings_list[idx]
-                                self.placing_item_type = "building"
-                                self.placing_item_tag = bld
-                                self.show_inventory = False
-                                self.post_notification(f"Selected building '{bld}' for placement")
-                                pygame.time.wait(200)
-                                continue
-
-                    # Shop panel clicks to buy seeds or buildings
-                    elif self.show_shop:
-                        shop_x_start = 100
-                        shop_x_end = 350
-                        seeds_shop_start_y = 160
-
-                        if shop_x_start <= pos[0] <= shop_x_end:
-                            idx = (pos[1] - seeds_shop_start_y) // 30
-                            seeds_list = list(self.seeds_shop.items())
-                            if 0 <= idx < len(seeds_list):
-                                seed, price = seeds_list[idx]
-                                if CurrencyManager.deduct_currency("Money", price):
-                                    self.inventory.add_seed(seed, 1)
-                                    self.post_notification(f"Bought seed {seed} for ${price}")
-                                else:
-                                    self.post_notification("Not enough money!")
-                                pygame.time.wait(200)
-                                continue
-
-                        bld_x_start = 370
-                        bld_x_end = 700
-                        buildings_shop_start_y = 160
-
-                        if bld_x_start <= pos[0] <= bld_x_end:
-                            idx = (pos[1] - buildings_shop_start_y) // 30
-                            buildings_list = list(self.buildings_shop.items())
-                            if 0 <= idx < len(buildings_list):
-                                bld, price = buildings_list[idx]
-                                if CurrencyManager.deduct_currency("Money", price):
-                                    self.inventory.add_building(bld, 1)
-                                    self.post_notification(f"Bought building {bld} for ${price}")
-                                else:
-                                    self.post_notification("Not enough money!")
-                                pygame.time.wait(200)
-                                continue
-
-                    # If no panel open, process game tile clicks
-                    if not (self.show_inventory or self.show_shop or self.show_info):
-                        self.handle_click(pos)
-
-    def handle_click(self, pos):
-        # Check button clicks first
-        for btn in self.buttons:
-            if btn.rect.collidepoint(pos):
-                btn.callback()
-                return
+                    if event.mod & pygame.KMOD_SHIFT:
+                        self.load_autosave()
+                    else:
+                        self.load_game()
+                elif event.key == pygame.K_F3:
+                    self.show_profiler = not self.show_profiler
+                elif event.key == pygame.K_e:
+                    self.export_json()
+                elif event.key == pygame.K_i:
+                    self.import_json()
+                elif event.key in (pygame.K_EQUALS, pygame.K_PLUS, pygame.K_KP_PLUS):
+                    self.sim_clock.faster()
+                    self.post_notification(f"Time speed x{self.sim_clock.time_scale}")
+                elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                    self.sim_clock.slower()
+                    self.post_notification(f"Time speed x{self.sim_clock.time_scale}")
+
+            elif event.type == pygame.MOUSEWHEEL:
+                self.camera.zoom_at(1.1 ** event.y, pygame.mouse.get_pos())
+
+            elif event.type == pygame.MOUSEMOTION and event.buttons[2]:
+                # Drag with the right mouse button to pan
+                self.camera.pan(-event.rel[0], -event.rel[1])
+
+            if event.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.MOUSEMOTION):
+                for action in self.input.feed(event, self.hit_targets, pygame.time.get_ticks(), pygame.key.get_mods()):
+                    self.apply_action(action.action, *action.args)
+
+    def hit_targets(self):
+        """What a click can hit right now, in priority order: buttons, the open panel, then the farm."""
+        targets = [btn.target() for btn in self.buttons]
+        if self.show_inventory:
+            targets += self.panel_targets(self.inventory.seeds, "select_item", "seed", PANEL_SEEDS_X)
+            targets += self.panel_targets(self.inventory.buildings, "select_item", "building", PANEL_BUILDINGS_X)
+        elif self.show_shop:
+            targets += self.panel_targets(self.seeds_shop, "buy_item", "seed", PANEL_SEEDS_X)
+            targets += self.panel_targets(self.buildings_shop, "buy_item", "building", PANEL_BUILDINGS_X)
+        if self.show_inventory or self.show_shop or self.show_info:
+            targets.append(HitTarget(None, lambda pos: None))  # an open panel keeps clicks off the farm
+        else:
+            targets.append(HitTarget(None, self.resolve_tile_click, draggable=True,
+                                     resolve_rect=self.resolve_tile_rect, resolve_fill=self.resolve_tile_fill))
+        return targets
+
+    def panel_targets(self, items, action, item_type, column):
+        """One target per row of a panel list, ``column`` being its ``(left, right)`` x range."""
+        left, right = column
+        return [
+            HitTarget(
+                pygame.Rect(left, PANEL_ROWS_Y + i * PANEL_ROW_HEIGHT, right - left, PANEL_ROW_HEIGHT),
+                lambda pos, tag=tag: (action, (item_type, tag)),
+            )
+            for i, tag in enumerate(list(items))
+        ]
 
-        clicked_tile = None
-        for tile in self.tiles:
-            if tile.rect.collidepoint(pos):
-                clicked_tile = tile
-                break
+    def resolve_tile_click(self, pos):
+        index = self.index_at(pos)
+        return None if index is None else ("click_tile", (index,))
 
-        if clicked_tile is None:
-            return
+    def resolve_tile_rect(self, start, end):
+        first, last = self.index_at(start), self.index_at(end)
+        return None if first is None or last is None else ("fill_rect", (first, last))
+
+    def resolve_tile_fill(self, pos):
+        index = self.index_at(pos)
+        return None if index is None else ("flood_fill", (index,))
+
+    def click_tile(self, index):
+        """Apply the current mode and any selected seed or building to tile ``index``."""
+        clicked_tile = self.tile(index)
 
         # Mode behavior
         if self.mode == MODE_DEFAULT:
             if not clicked_tile.farm:
                 clicked_tile.farm = True
-                clicked_tile.update_color = lambda: None  # placeholder, visual updated in draw()
                 self.post_notification("Plowed soil!")
 
         elif self.mode == MODE_WATERING:
             if clicked_tile.farm:
-                clicked_tile.humidity = min(100, clicked_tile.humidity + 20)
+                clicked_tile.humidity = min(100, clicked_tile.humidity + WATER_AMOUNT)
                 self.post_notification("Watered soil!")
             else:
                 self.post_notification("Can't water non-farmed soil!")
 
+        elif self.mode == MODE_CLEARING:
+            if clicked_tile.farm:
+                self.engine.clear(index)
+                self.post_notification("Cleared soil!")
+
         elif self.mode == MODE_CURSOR:
             # No farming or watering actions on click
             pass
@@ -599,7 +864,7 @@ class Game:
                 if not clicked_tile.farm:
                     self.post_notification("Soil must be farmed to plant!")
                     return
-                if clicked_tile.humidity < 20:
+                if clicked_tile.humidity < PLANT_MIN_HUMIDITY:
                     self.post_notification("Soil moisture too low to plant!")
                     return
                 if clicked_tile.planted_seed:
@@ -638,100 +903,201 @@ class Game:
                 self.placing_item_type = None
                 self.placing_item_tag = None
 
+    def fill_rect(self, first, last):
+        """Apply the area tool to every tile in the rectangle with corner tiles ``first`` and ``last``."""
+        tool = self.area_tool()
+        if tool:
+            self.apply_area(tool, self.engine.rect_indices(first, last).ravel())
+
+    def flood_fill(self, index):
+        """Apply the area tool to the tiles it can act on that are connected to tile ``index``."""
+        tool = self.area_tool()
+        if tool:
+            self.apply_area(tool, self.engine.flood_indices(index, lambda tiles: self.area_eligible(tool, tiles)))
+
+    def area_tool(self):
+        """What area actions do right now ("plow", "water", "plant" or "clear"), or None."""
+        if self.placing_item_type == "seed":
+            return "plant"
+        if self.placing_item_type is None and self.mode in AREA_TOOLS:
+            return AREA_TOOLS[self.mode]
+        self.post_notification("Pick a mode or a seed to use on an area")
+        return None
+
+    def area_eligible(self, tool, index):
+        """Mask of the tiles at ``index`` that ``tool`` can act on."""
+        engine = self.engine
+        if tool == "plow":
+            return ~engine.farm[index] & (engine.building[index] == 0)
+        if tool == "water":
+            return engine.farm[index]
+        if tool == "plant":
+            return engine.farm[index] & (engine.planted_seed[index] == 0) & (engine.humidity[index] >= PLANT_MIN_HUMIDITY)
+        return engine.farm[index]  # clear
+
+    def apply_area(self, tool, index):
+        """Run ``tool`` on all tiles at ``index`` it can act on as one batch, with one notification."""
+        index = index[self.area_eligible(tool, index)]
+        if tool == "plant":
+            self.plant_area(index)
+            return
+        if not index.size:
+            self.post_notification(f"Nothing to {tool} there!")
+            return
+        if tool == "plow":
+            self.engine.plow(index)
+            self.post_notification(f"Plowed {index.size} tiles!")
+        elif tool == "water":
+            self.engine.water(index, WATER_AMOUNT)
+            self.post_notification(f"Watered {index.size} tiles!")
+        else:
+            self.engine.clear(index)
+            self.post_notification(f"Cleared {index.size} tiles!")
+
+    def plant_area(self, index):
+        """Plant the selected seed on ``index``, buying whatever the inventory is short of in one go."""
+        tag = self.placing_item_tag
+        if not index.size:
+            self.post_notification("No farmed, moist and empty soil to plant there!")
+            return
+        owned = min(self.inventory.seeds.get(tag, 0), index.size)
+        price = self.seeds_shop[tag]
+        bought = index.size - owned
+        if price:
+            bought = min(bought, self.ledger.get("Money") // price)
+        if bought:
+            self.ledger.spend("Money", bought * price, f"buy {tag}", self.sim_clock.ticks)
+        if owned:
+            self.inventory.use_seed(tag, owned)
+        planted = index[:owned + bought]
+        if not planted.size:
+            self.post_notification("No seeds left and not enough money!")
+            return
+        self.engine.plant(planted, self.engine.seed_id(tag))
+        message = f"Planted {planted.size} {tag}"
+        if bought:
+            message += f" (bought {bought} seeds for ${bought * price})"
+        if planted.size < index.size:
+            message += f", {index.size - planted.size} tiles left empty"
+        self.post_notification(message + "!")
+        self.clear_placement()
+
     def update(self, dt):
-        current_time = time.time()
-        elapsed = current_time - self.start_time
-        day_num = int(elapsed // DAY_LENGTH_SEC) + 1
+        day_num = int(self.sim_time // DAY_LENGTH_SEC) + 1  # the day this tick starts in
+        self.sim_time += dt
 
         if day_num != self.last_day_num:
             self.last_day_num = day_num
             self.daily_update(day_num)
 
-        # Update all tiles
-        for tile in self.tiles:
-            tile.update(dt, self.environment)
-
-            if tile.ready_to_harvest:
-                # Harvest the crop
-                harvest_values = {
-                    "wheat": 10,
-                    # add other seeds and their sell values here
-                }
-                seed_tag = tile.planted_seed
-                money_earned = harvest_values.get(seed_tag, 5)
-
-                CurrencyManager.add_currency("Money", money_earned)
-
-                # Reset tile to grass block (not farmed)
-                tile.planted_seed = None
-                tile.growth_stage = 0
-                tile.growth_time = 0
-                tile.withered = False
-                tile.farm = False  # Turns back to grass block
-
-                tile.ready_to_harvest = False
-
-                if hasattr(tile, "update_color"):
-                    tile.update_color()
+        transactions = []  # (currency, delta, cause), applied to the ledger in one batch
 
+        # Update all tiles
+        with self.profiler.phase("tiles"):
+            if self.lod:
+                harvested, seed_ids = self.lod.step(self.engine, dt)
+                self.profiler.count("tiles_updated", self.lod.last_stepped)
+            else:
+                harvested, seed_ids = self.engine.step(dt)
+                self.profiler.count("tiles_updated", self.engine.size)
+        if harvested.size:
+            self.total_harvested += harvested.size
+            money_earned = self.harvest_income(seed_ids)
+            transactions.append(("Money", money_earned, "harvest"))
+
+            if harvested.size == 1:
+                seed_tag = self.engine.seed_tags[seed_ids[0]]
                 self.post_notification(f"Auto-harvested {seed_tag} for ${money_earned}!")
+            else:
+                self.post_notification(f"Auto-harvested {harvested.size} crops for ${money_earned}!")
 
         # Buildings produce:
-        for tile in self.tiles:
-            
-            if tile.building == "MoneyFactory":
-                tile.building_timer = getattr(tile, "building_timer", 0) + dt
-                if tile.building_timer >= 5:
-                    tile.building_timer = 0
-                    CurrencyManager.add_currency("Money", 5)
-                    self.post_notification("Money Factory produced $5!")
-            elif tile.building == "EnergyFactory":
-                tile.building_timer = getattr(tile, "building_timer", 0) + dt
-                if tile.building_timer >= 8:
-                    tile.building_timer = 0
-                    CurrencyManager.add_currency("Energy", 10)
-                    self.post_notification("Energy Factory produced 10 Energy!")
-            elif tile.building == "FertilizerFactory":
-                tile.building_timer = getattr(tile, "building_timer", 0) + dt
-                if tile.building_timer >= 6:
-                    tile.building_timer = 0
-                    # Fertilize nearby farmed soil: +10 humidity
-                    self.fertilize_nearby(tile)
-                    self.post_notification("Fertilizer increased soil humidity nearby!")
-
-    def fertilize_nearby(self, tile, radius=1):
-        tx, ty = tile.rect.x, tile.rect.y
-        for other in self.tiles:
-            ox, oy = other.rect.x, other.rect.y
-            if abs(tx - ox) <= GRID_SIZE * radius and abs(ty - oy) <= GRID_SIZE * radius:
-                if other.farm:
-                    other.humidity = min(100, other.humidity + 10)
+        with self.profiler.phase("factories"):
+            self.update_buildings(dt, transactions)
+
+        self.ledger.apply(transactions, self.sim_clock.ticks)
+        self.sim_clock.ticks += 1
+
+    def harvest_income(self, seed_ids):
+        """Money for harvesting crops of ``seed_ids`` (one entry per tile)."""
+        return int(self.engine.crops.sell_price[seed_ids].sum())
+
+    def factory_income(self, counts, transactions):
+        """Add the output of ``counts[building_id]`` production cycles to ``transactions``."""
+        for tag, (currency, amount) in FACTORY_OUTPUT.items():
+            if counts[BUILDING_IDS[tag]]:
+                transactions.append((currency, amount * int(counts[BUILDING_IDS[tag]]), tag))
+
+    def update_buildings(self, dt, transactions):
+        produced = self.engine.step_buildings(dt)
+        if produced.size:
+            counts = np.bincount(self.engine.building[produced], minlength=len(BUILDING_TAGS))
+            self.factory_income(counts, transactions)
+
+            if counts[BUILDING_IDS["MoneyFactory"]]:
+                self.post_notification("Money Factory produced $5!")
+            if counts[BUILDING_IDS["EnergyFactory"]]:
+                self.post_notification("Energy Factory produced 10 Energy!")
+            if counts[BUILDING_IDS["FertilizerFactory"]]:
+                # Fertilize nearby farmed soil: +10 humidity, all factories at once
+                fertilizers = produced[self.engine.building[produced] == BUILDING_IDS["FertilizerFactory"]]
+                AREA_EFFECTS["fertilizer"].apply(self.engine, fertilizers)
+                self.post_notification("Fertilizer increased soil humidity nearby!")
+
+    def tile(self, index):
+        return GrassTile(self.engine, index)
+
+    def index_at(self, pos):
+        """Index of the tile under screen position ``pos``, or None."""
+        zoom = self.camera.zoom
+        return self.engine.index_at(pos[0] / zoom, pos[1] / zoom, self.camera.origin)
+
+    def tile_at(self, pos):
+        index = self.index_at(pos)
+        return None if index is None else self.tile(index)
+
+    def update_camera(self, frame_dt):
+        keys = pygame.key.get_pressed()
+        step = CAMERA_PAN_SPEED * frame_dt
+        dx = (keys[pygame.K_RIGHT] - keys[pygame.K_LEFT]) * step
+        dy = (keys[pygame.K_DOWN] - keys[pygame.K_UP]) * step
+        if dx or dy:
+            self.camera.pan(dx, dy)
+
+        if self.lod:
+            col0, row0, col1, row1 = self.camera.visible_tiles(GRID_SIZE)
+            margin = NEAR_CHUNK_MARGIN * self.chunks.chunk_size
+            self.lod.set_focus(self.chunks.chunks_in(col0 - margin, row0 - margin, col1 + margin, row1 + margin))
 
     def draw(self):
         self.win.fill((0, 0, 0))
+        calls = DRAW.calls
 
-        # Draw tiles
-        for tile in self.tiles:
-            tile.draw(self.win)
+        # Draw tiles: one pixel per visible tile scaled to the zoom, reused while nothing on screen changed
+        redrawn = self.tile_layer.draw(self.win, self.camera)
+        self.profiler.count("tiles_redrawn", redrawn)
 
         # Highlight hovered tile
-        mx, my = pygame.mouse.get_pos()
-        for tile in self.tiles:
-            if tile.rect.collidepoint((mx, my)):
-                color = (255, 255, 255)
-                if self.placing_item_type:
-                    if self.placing_item_type == "seed":
-                        if tile.farm and not tile.planted_seed and tile.humidity >= 20:
-                            color = (0, 255, 0)  # green border if valid
-                        else:
-                            color = (255, 0, 0)  # red invalid
-                    elif self.placing_item_type == "building":
-                        if not tile.farm and not tile.building:
-                            color = (255, 165, 0) # orange valid
-                        else:
-                            color = (255, 0, 0)
-                pygame.draw.rect(self.win, color, tile.rect, 3)
-                break
+        tile = self.tile_at(pygame.mouse.get_pos())
+        if tile is not None:
+            color = (255, 255, 255)
+            if self.placing_item_type:
+                if self.placing_item_type == "seed":
+                    if tile.farm and not tile.planted_seed and tile.humidity >= PLANT_MIN_HUMIDITY:
+                        color = (0, 255, 0)  # green border if valid
+                    else:
+                        color = (255, 0, 0)  # red invalid
+                elif self.placing_item_type == "building":
+                    if not tile.farm and not tile.building:
+                        color = (255, 165, 0) # orange valid
+                    else:
+                        color = (255, 0, 0)
+            DRAW.rect(self.win, color, self.camera.world_to_screen_rect(tile.rect), 3)
+
+        # Outline the rectangle being dragged out for an area action
+        area = self.dragged_rect()
+        if area is not None:
+            DRAW.rect(self.win, (255, 255, 0), self.camera.world_to_screen_rect(area), 2)
 
         # Draw buttons
         for btn in self.buttons:
@@ -739,23 +1105,26 @@ class Game:
 
         # Draw HUD info
         # Mode display
-        mode_text = FONT.render(f"Mode: {self.mode}", True, (255, 255, 255))
-        self.win.blit(mode_text, (WIDTH - 150, 60))
+        mode_text = render_text(FONT, f"Mode: {self.mode}", (255, 255, 255))
+        DRAW.blit(self.win, mode_text, (WIDTH - 150, 60))
 
         # Day info
-        day_text = FONT.render(f"Day: {self.last_day_num}", True, (255, 255, 255))
-        self.win.blit(day_text, (WIDTH // 2 - 50, 10))
+        day_label = f"Day: {self.last_day_num}"
+        if self.sim_clock.time_scale != 1:
+            day_label += f"  (x{self.sim_clock.time_scale})"
+        day_text = render_text(FONT, day_label, (255, 255, 255))
+        DRAW.blit(self.win, day_text, (WIDTH // 2 - 50, 10))
 
         # Currency info
-        money_text = FONT.render(f"Money: ${CurrencyManager.get_currency('Money')}", True, (255, 255, 0))
-        energy_text = FONT.render(f"Energy: {CurrencyManager.get_currency('Energy')}", True, (0, 255, 255))
-        self.win.blit(money_text, (WIDTH // 2 - 150, 35))
-        self.win.blit(energy_text, (WIDTH // 2 + 50, 35))
+        money_text = render_text(FONT, f"Money: ${self.ledger.get('Money')}", (255, 255, 0))
+        energy_text = render_text(FONT, f"Energy: {self.ledger.get('Energy')}", (0, 255, 255))
+        DRAW.blit(self.win, money_text, (WIDTH // 2 - 150, 35))
+        DRAW.blit(self.win, energy_text, (WIDTH // 2 + 50, 35))
 
         # Notification
-        if time.time() - self.notification_time < 3:
-            notif_text = FONT.render(self.notification, True, (255, 255, 100))
-            self.win.blit(notif_text, (WIDTH // 2 - notif_text.get_width() // 2, HEIGHT - 30))
+        if time.time() - self.notification_time < NOTIFICATION_SEC:
+            notif_text = render_text(FONT, self.notification, (255, 255, 100))
+            DRAW.blit(self.win, notif_text, (WIDTH // 2 - notif_text.get_width() // 2, HEIGHT - 30))
 
         # Inventory Panel
         if self.show_inventory:
@@ -772,92 +1141,185 @@ class Game:
             pygame.mouse.set_visible(False)
             mx, my = pygame.mouse.get_pos()
             rect = self.cursor_img_building.get_rect(center=(mx, my))
-            self.win.blit(self.cursor_img_building, rect)
+            DRAW.blit(self.win, self.cursor_img_building, rect)
         elif self.placing_item_type == "seed" and self.cursor_img_seeding:
             pygame.mouse.set_visible(False)
             mx, my = pygame.mouse.get_pos()
             rect = self.cursor_img_seeding.get_rect(center=(mx, my))
-            self.win.blit(self.cursor_img_seeding, rect)
+            DRAW.blit(self.win, self.cursor_img_seeding, rect)
         else:
             # Show default system cursor if not placing
             pygame.mouse.set_visible(True)
 
+        self.profiler.count("draw_calls", DRAW.calls - calls)
+        if self.show_profiler:
+            self.draw_profiler_overlay()
+
+    def dragged_rect(self):
+        """World rect covering the tiles of the rectangle being dragged out, or None."""
+        if self.input.rect_start is None:
+            return None
+        first, last = self.index_at(self.input.rect_start), self.index_at(self.input.rect_end)
+        if first is None or last is None:
+            return None
+        corners = self.engine.rect_indices(first, last)
+        return self.tile(corners[0, 0]).rect.union(self.tile(corners[-1, -1]).rect)
+
+    def screen_state(self):
+        """What the frame shows apart from the tiles, as ``(hud, notification, scene)``."""
+        mouse = pygame.mouse.get_pos()
+        hud = (
+            self.mode,
+            self.last_day_num,
+            self.sim_clock.time_scale,
+            self.ledger.get("Money"),
+            self.ledger.get("Energy"),
+            tuple(btn.rect.collidepoint(mouse) for btn in self.buttons),
+        )
+        notification = self.notification if time.time() - self.notification_time < NOTIFICATION_SEC else None
+        scene = (
+            self.index_at(mouse),
+            self.placing_item_type,
+            self.placing_item_tag,
+            mouse if self.placing_item_type else None,  # the placing cursor follows the mouse
+            self.dragged_rect(),
+            self.show_inventory and (tuple(self.inventory.seeds.items()), tuple(self.inventory.buildings.items())),
+            self.show_shop,
+            self.show_info and (tuple(self.environment.items()), self.last_day_num),
+            self.show_profiler and tuple(self.profiler.overlay()),
+        )
+        return hud, notification, scene
+
+    def changed_rects(self):
+        """Screen areas that differ from the frame on the display: ``[]`` when idle, None for all of it."""
+        state = self.screen_state()
+        shown, self.shown_state = self.shown_state, state
+        if self.redraw_all or shown is None or state[2] != shown[2] or self.tile_layer.changed(self.camera):
+            self.redraw_all = False
+            return None
+        rects = []
+        if state[0] != shown[0]:
+            rects.append(HUD_RECT)
+        if state[1] != shown[1]:
+            rects.append(NOTIFICATION_RECT)
+        return rects
+
+    def present(self, rects):
+        """Show the drawn frame: only ``rects`` of it, or the whole window when None."""
+        if self.headless:  # headless frames stay on the off-screen surface
+            return
+        if rects is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(rects)
 
-        pygame.display.flip()
+    def draw_profiler_overlay(self):
+        lines = self.profiler.overlay()
+        panel_rect = pygame.Rect(10, 60, 330, 10 + 18 * len(lines))
+        DRAW.rect(self.win, (20, 20, 20), panel_rect)
+        y = panel_rect.y + 5
+        for line in lines:
+            DRAW.blit(self.win, render_text(FONT_SMALL, line, (180, 255, 180)), (panel_rect.x + 8, y))
+            y += 18
 
     def draw_inventory_panel(self):
         panel_rect = pygame.Rect(100, 100, 700, 400)
-        pygame.draw.rect(self.win, (30, 30, 30), panel_rect)
-        pygame.draw.rect(self.win, (100, 100, 100), panel_rect, 3)
+        DRAW.rect(self.win, (30, 30, 30), panel_rect)
+        DRAW.rect(self.win, (100, 100, 100), panel_rect, 3)
 
         # Seeds Inventory - left side
-        seed_text = BIG_FONT.render("Seeds Inventory", True, (200, 200, 255))
-        self.win.blit(seed_text, (panel_rect.x + 20, panel_rect.y + 10))
+        seed_text = render_text(BIG_FONT, "Seeds Inventory", (200, 200, 255))
+        DRAW.blit(self.win, seed_text, (panel_rect.x + 20, panel_rect.y + 10))
 
         y = panel_rect.y + 60
         for seed, count in self.inventory.seeds.items():
-            text = FONT.render(f"{seed} (x{count})", True, (255, 255, 255))
-            self.win.blit(text, (panel_rect.x + 30, y))
+            text = render_text(FONT, f"{seed} (x{count})", (255, 255, 255))
+            DRAW.blit(self.win, text, (panel_rect.x + 30, y))
             y += 30
 
         # Buildings Inventory - right side
-        building_text = BIG_FONT.render("Buildings Inventory", True, (200, 200, 255))
-        self.win.blit(building_text, (panel_rect.x + 360, panel_rect.y + 10))
+        building_text = render_text(BIG_FONT, "Buildings Inventory", (200, 200, 255))
+        DRAW.blit(self.win, building_text, (panel_rect.x + 360, panel_rect.y + 10))
 
         y = panel_rect.y + 60
         for bld, count in self.inventory.buildings.items():
-            text = FONT.render(f"{bld} (x{count})", True, (255, 255, 255))
-            self.win.blit(text, (panel_rect.x + 370, y))
+            text = render_text(FONT, f"{bld} (x{count})", (255, 255, 255))
+            DRAW.blit(self.win, text, (panel_rect.x + 370, y))
             y += 30
 
     def draw_shop_panel(self):
         panel_rect = pygame.Rect(100, 100, 700, 400)
-        pygame.draw.rect(self.win, (30, 30, 30), panel_rect)
-        pygame.draw.rect(self.win, (100, 100, 100), panel_rect, 3)
+        DRAW.rect(self.win, (30, 30, 30), panel_rect)
+        DRAW.rect(self.win, (100, 100, 100), panel_rect, 3)
 
-        seed_text = BIG_FONT.render("Seeds Shop", True, (200, 200, 255))
-        self.win.blit(seed_text, (panel_rect.x + 20, panel_rect.y + 10))
+        seed_text = render_text(BIG_FONT, "Seeds Shop", (200, 200, 255))
+        DRAW.blit(self.win, seed_text, (panel_rect.x + 20, panel_rect.y + 10))
 
         y = panel_rect.y + 60
         for seed, price in self.seeds_shop.items():
-            text = FONT.render(f"{seed} - ${price}", True, (255, 255, 255))
-            self.win.blit(text, (panel_rect.x + 30, y))
+            text = render_text(FONT, f"{seed} - ${price}", (255, 255, 255))
+            DRAW.blit(self.win, text, (panel_rect.x + 30, y))
             y += 30
 
-        building_text = BIG_FONT.render("Buildings Shop", True, (200, 200, 255))
-        self.win.blit(building_text, (panel_rect.x + 360, panel_rect.y + 10))
+        building_text = render_text(BIG_FONT, "Buildings Shop", (200, 200, 255))
+        DRAW.blit(self.win, building_text, (panel_rect.x + 360, panel_rect.y + 10))
 
         y = panel_rect.y + 60
         for bld, price in self.buildings_shop.items():
-            text = FONT.render(f"{bld} - ${price}", True, (255, 255, 255))
-            self.win.blit(text, (panel_rect.x + 370, y))
+            text = render_text(FONT, f"{bld} - ${price}", (255, 255, 255))
+            DRAW.blit(self.win, text, (panel_rect.x + 370, y))
             y += 30
 
     def draw_info_panel(self):
-        panel_rect = pygame.Rect(WIDTH - 200, 80, 180, 120)
-        pygame.draw.rect(self.win, (30, 30, 60), panel_rect)
-        pygame.draw.rect(self.win, (100, 100, 150), panel_rect, 2)
+        panel_rect = pygame.Rect(WIDTH - 200, 80, 180, 145)
+        DRAW.rect(self.win, (30, 30, 60), panel_rect)
+        DRAW.rect(self.win, (100, 100, 150), panel_rect, 2)
 
         info_items = [
             f"Temperature: {self.environment['temperature']:.1f} °C",
             f"Humidity: {self.environment['humidity']:.1f} %",
             f"Soil Moisture: {self.environment['soil_moisture']:.1f} %",
+            f"Rain: {self.environment.get('precipitation', 0):.1f} mm",
             f"Current Day: {self.last_day_num}",
         ]
 
         y = panel_rect.y + 10
         for item in info_items:
-            text = FONT.render(item, True, (255, 255, 255))
-            self.win.blit(text, (panel_rect.x + 10, y))
+            text = render_text(FONT, item, (255, 255, 255))
+            DRAW.blit(self.win, text, (panel_rect.x + 10, y))
             y += 25
 
     def run(self):
+        self.autosaver = AutoSaver()
+        idle = False
         while self.running:
-            dt = self.clock.tick(60) / 1000.0
-            self.handle_events()
-            self.update(dt)
-            self.draw()
-
+            # Nothing changed last frame: wake up less often, unless time is sped up, when the ticks of
+            # a long frame could exceed the per-frame cap and be dropped (SimClock.advance)
+            frame_dt = self.clock.tick(IDLE_FPS if idle and self.sim_clock.time_scale == 1 else RENDER_FPS) / 1000.0
+            self.profiler.end_frame()
+            with self.profiler.phase("events"):
+                self.handle_events()
+                self.update_camera(frame_dt)
+            # Fixed-step simulation: however long the frame took, each tick is tick_dt
+            with self.profiler.phase("update"):
+                for _ in range(self.sim_clock.advance(frame_dt)):
+                    self.update(self.sim_clock.tick_dt)
+            with self.profiler.phase("autosave"):
+                self.autosaver.update(self)
+                for message in self.autosaver.poll():
+                    self.post_notification(message)
+            with self.profiler.phase("draw"):
+                rects = self.changed_rects()
+                idle = rects == []
+                if not idle:
+                    self.draw()
+                    self.present(rects)
+
+        self.autosaver.close(self)
+        if self.recorder:
+            self.recorder.close(self)
+        if self.profile_out:
+            self.profiler.dump(self.profile_out)
         pygame.quit()
 
 
@@ -865,5 +1327,14 @@ class Game:
 # Run Game
 # ----------------------------------------
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Farming Game")
+    parser.add_argument("--profile-out", help="dump per-frame timings to this JSON-lines file on exit")
+    parser.add_argument("--record", help="record player input to this file for Game/replay.py")
+    args = parser.parse_args()
+
     game = Game()
+    game.profile_out = args.profile_out
+    if args.record:
+        game.lod = None  # replays simulate every tile every tick, so the recorded session must too
+        game.recorder = InputRecorder(args.record, game)
     game.run()
\ No newline at end of file
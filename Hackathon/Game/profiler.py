@@ -0,0 +1,92 @@
+import json
+import time
+from collections import deque, defaultdict
+from contextlib import contextmanager
+
+PROFILE_WINDOW = 600  # frames kept for the rolling statistics
+OVERLAY_REFRESH_SEC = 0.5
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(p / 100 * len(sorted_values)))]
+
+
+class FrameProfiler:
+    """Per-frame phase timers and counters with rolling percentiles.
+
+    Wrap work in ``with profiler.phase("name"):`` (phases may nest and repeat
+    within a frame; their time adds up) and bump counters with ``count``.
+    ``end_frame`` closes the frame and keeps it in a window of the last
+    ``window`` frames.
+    """
+
+    def __init__(self, window=PROFILE_WINDOW):
+        self.frames = deque(maxlen=window)
+        self.frame_start = time.perf_counter_ns()
+        self.phase_ns = defaultdict(int)
+        self.counts = defaultdict(int)
+        self.overlay_lines = []
+        self.overlay_time = 0.0
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.phase_ns[name] += time.perf_counter_ns() - start
+
+    def count(self, name, amount=1):
+        self.counts[name] += amount
+
+    def end_frame(self):
+        now = time.perf_counter_ns()
+        self.frames.append({
+            "frame_ms": (now - self.frame_start) / 1e6,
+            "phases_ms": {name: ns / 1e6 for name, ns in self.phase_ns.items()},
+            "counts": dict(self.counts),
+        })
+        self.frame_start = now
+        self.phase_ns.clear()
+        self.counts.clear()
+
+    def summary(self):
+        """Rolling p50/p95/p99 of the frame time and every phase, plus mean counts."""
+        def stats(values):
+            values = sorted(values)
+            return {f"p{p}": round(percentile(values, p), 3) for p in (50, 95, 99)}
+
+        phases = {name for frame in self.frames for name in frame["phases_ms"]}
+        counts = {name for frame in self.frames for name in frame["counts"]}
+        n = max(1, len(self.frames))
+        return {
+            "frames": len(self.frames),
+            "frame_ms": stats(frame["frame_ms"] for frame in self.frames),
+            "phases_ms": {name: stats(frame["phases_ms"].get(name, 0.0) for frame in self.frames)
+                          for name in sorted(phases)},
+            "mean_counts": {name: sum(frame["counts"].get(name, 0) for frame in self.frames) / n
+                            for name in sorted(counts)},
+        }
+
+    def overlay(self):
+        """Text lines for the in-game overlay, refreshed a couple of times a second."""
+        now = time.monotonic()
+        if now - self.overlay_time >= OVERLAY_REFRESH_SEC:
+            self.overlay_time = now
+            summary = self.summary()
+            frame = summary["frame_ms"]
+            self.overlay_lines = [f"frame  p50 {frame['p50']:.1f}  p95 {frame['p95']:.1f}  p99 {frame['p99']:.1f} ms"]
+            for name, phase in summary["phases_ms"].items():
+                self.overlay_lines.append(f"{name:<10} p50 {phase['p50']:.2f}  p95 {phase['p95']:.2f} ms")
+            for name, mean in summary["mean_counts"].items():
+                self.overlay_lines.append(f"{name:<14} {mean:,.0f}/frame")
+        return self.overlay_lines
+
+    def dump(self, path):
+        """Write the frames in the window, then a summary line, as JSON lines."""
+        with open(path, "w") as f:
+            for frame in self.frames:
+                f.write(json.dumps(frame) + "\n")
+            f.write(json.dumps({"summary": self.summary()}) + "\n")
@@ -0,0 +1,92 @@
+"""Player input recordings, written one JSON object per line.
+
+The first line describes the game the recording was made on, then each
+action is ``{"tick": ..., "action": ..., "args": [...]}`` where ``tick`` is
+how many simulation ticks had run when the player did it. The last line,
+``{"end": ticks, "state": hash}``, marks how long the session ran and the
+state_hash it ended in. Replaying the actions on the same ticks
+(Game/replay.py) must reproduce that state.
+"""
+import json
+import hashlib
+
+RECORDING_FORMAT = "agdm-input"
+RECORDING_VERSION = 1
+
+
+class RecordingError(Exception):
+    pass
+
+
+def state_hash(game):
+    """SHA-256 of everything the simulation decides: tiles, economy, inventory and clocks."""
+    digest = hashlib.sha256()
+    for name, column in game.engine.snapshot_columns(copy=False).items():
+        digest.update(name.encode())
+        digest.update(column.tobytes())
+    digest.update(json.dumps({
+        "seed_tags": game.engine.seed_tags,
+        "currencies": game.ledger.balances,
+        "inventory_seeds": game.inventory.seeds,
+        "inventory_buildings": game.inventory.buildings,
+        "sim_time": game.sim_time,
+        "building_time": game.engine.time,
+        "total_harvested": game.total_harvested,
+    }, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+class InputRecorder:
+    """Appends every action passed to Game.apply_action to ``path``.
+
+    Recordings start from a fresh farm, so start recording before the first
+    tick and don't load a save while recording. The game must simulate every
+    tile every tick (``game.lod`` None) for a replay to match it.
+    """
+
+    def __init__(self, path, game):
+        self.path = path
+        self.file = open(path, "w")
+        self.actions = 0
+        header = {
+            "format": RECORDING_FORMAT,
+            "version": RECORDING_VERSION,
+            "cols": game.engine.cols,
+            "rows": game.engine.rows,
+            "tick_rate": game.sim_clock.tick_rate,
+            "environment_file": game.environment_file,
+        }
+        self.file.write(json.dumps(header) + "\n")
+
+    def record(self, tick, action, args):
+        self.file.write(json.dumps({"tick": tick, "action": action, "args": list(args)}) + "\n")
+        self.actions += 1
+
+    def close(self, game):
+        """Finish the recording with how long ``game`` ran and the state it ended in."""
+        if self.file.closed:
+            return
+        self.file.write(json.dumps({"end": game.sim_clock.ticks, "state": state_hash(game)}) + "\n")
+        self.file.close()
+
+
+def read_recording(path):
+    """Return ``(header, actions, end_tick, end_state)``; actions are ``(tick, action, args)`` in order.
+
+    ``end_tick`` and ``end_state`` are None when the session didn't close
+    cleanly; the recording then ends with its last action.
+    """
+    with open(path, "r") as f:
+        lines = [json.loads(line) for line in f if line.strip()]
+    if not lines or lines[0].get("format") != RECORDING_FORMAT:
+        raise RecordingError(f"{path} is not an input recording")
+    if lines[0].get("version") != RECORDING_VERSION:
+        raise RecordingError(f"Unsupported recording version {lines[0].get('version')}")
+
+    header, actions, end_tick, end_state = lines[0], [], None, None
+    for line in lines[1:]:
+        if "end" in line:
+            end_tick, end_state = line["end"], line.get("state")
+        else:
+            actions.append((line["tick"], line["action"], line["args"]))
+    return header, actions, end_tick, end_state
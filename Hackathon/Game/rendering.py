@@ -0,0 +1,217 @@
+from collections import OrderedDict
+
+import numpy as np
+import pygame
+
+
+BRIGHTNESS_LEVELS = 64  # humidity shades of a planted tile in the palette
+MIN_BRIGHTNESS = 0.4
+DRY_SOIL_HUMIDITY = 30  # bare soil below this is drawn darker
+GRID_LINE_COLOR = (50, 50, 50)
+GRID_MIN_TILE_PX = 6  # grid lines are left out once tiles are smaller than this on screen
+GRID_CACHE_LIMIT = 4
+
+# Palette layout: fixed entries, then buildings by id, then planted tiles by stage and brightness
+PALETTE_GRASS = 0
+PALETTE_FARMED = 1
+PALETTE_DRY = 2
+PALETTE_WITHERED = 3
+PALETTE_BUILDINGS = 4  # + building id - 1
+
+
+def tile_palette(grass, farmed, dry, withered, buildings, plant_stages, levels=BRIGHTNESS_LEVELS):
+    """Colour lookup table for TileRaster, as a ``(n, 3)`` uint8 array.
+
+    ``buildings`` lists colours by building id starting at 1. Each plant
+    stage colour gets ``levels`` entries, dimmed with humidity as far as
+    MIN_BRIGHTNESS.
+    """
+    brightness = np.maximum(MIN_BRIGHTNESS, np.arange(levels) / (levels - 1))
+    plants = (np.array(plant_stages, dtype=np.float64)[:, None, :] * brightness[None, :, None]).astype(np.uint8)
+    fixed = np.array([grass, farmed, dry, withered] + list(buildings), dtype=np.uint8)
+    return np.concatenate([fixed, plants.reshape(-1, 3)])
+
+
+class TileRaster:
+    """Draws the visible tiles as one pixel each, then scales them up in one blit.
+
+    Tile state is turned into palette indices and colours with a few numpy
+    operations, written through ``pygame.surfarray`` and scaled to the
+    camera's zoom; grid lines come from a cached overlay. The scaled frame is
+    kept and blitted again as long as the view is unchanged and no visible
+    tile is dirty.
+    """
+
+    def __init__(self, engine, palette, levels=BRIGHTNESS_LEVELS):
+        self.engine = engine
+        self.palette = palette
+        self.levels = levels
+        self.plants_start = len(palette) - 3 * levels
+        self.view = None  # (tile block, screen rect) of the cached frame
+        self.frame = None
+        self.grids = OrderedDict()  # (cols, rows, width, height, thickness) -> overlay Surface
+
+    def invalidate(self):
+        self.view = None
+
+    def palette_indices(self, rows, cols):
+        """Palette index of every tile in the ``rows``/``cols`` slices of the grid."""
+        engine = self.engine
+        farm = engine.grid(engine.farm)[rows, cols]
+        humidity = engine.grid(engine.humidity)[rows, cols]
+        building = engine.grid(engine.building)[rows, cols]
+        withered = engine.grid(engine.withered)[rows, cols]
+        planted = engine.grid(engine.planted_seed)[rows, cols] != 0
+        stage = engine.grid(engine.growth_stage)[rows, cols]
+
+        index = np.where(farm, np.where(humidity < DRY_SOIL_HUMIDITY, PALETTE_DRY, PALETTE_FARMED), PALETTE_GRASS)
+        growing = farm & planted & ~withered
+        level = np.clip(humidity[growing] * ((self.levels - 1) / 100.0), 0, self.levels - 1).astype(np.intp)
+        index[growing] = self.plants_start + stage[growing].astype(np.intp) * self.levels + level
+        index[farm & withered] = PALETTE_WITHERED
+        has_building = building != 0
+        index[has_building] = PALETTE_BUILDINGS + building[has_building] - 1
+        return index
+
+    def grid_overlay(self, cols, rows, width, height, thickness=1):
+        """Transparent surface with every tile's outline, for ``cols`` x ``rows`` tiles scaled to ``width`` x ``height``."""
+        key = (cols, rows, width, height, thickness)
+        overlay = self.grids.get(key)
+        if overlay is not None:
+            self.grids.move_to_end(key)
+            return overlay
+
+        # Same pixels pygame.transform.scale gives each tile; outline its first and last column/row
+        x_edges = -(-np.arange(cols + 1) * width // cols)
+        y_edges = -(-np.arange(rows + 1) * height // rows)
+        lines = np.zeros((width, height), dtype=bool)
+        for t in range(thickness):
+            lines[np.clip(np.concatenate([x_edges[:-1] + t, x_edges[1:] - 1 - t]), 0, width - 1), :] = True
+            lines[:, np.clip(np.concatenate([y_edges[:-1] + t, y_edges[1:] - 1 - t]), 0, height - 1)] = True
+
+        pixels = np.zeros((width, height, 3), dtype=np.uint8)
+        pixels[~lines] = (255, 0, 255)
+        pixels[lines] = GRID_LINE_COLOR
+        overlay = pygame.surfarray.make_surface(pixels)
+        overlay.set_colorkey((255, 0, 255))
+        self.grids[key] = overlay
+        if len(self.grids) > GRID_CACHE_LIMIT:
+            self.grids.popitem(last=False)
+        return overlay
+
+    def visible_view(self, camera):
+        """``(col0, row0, col1, row1, screen_rect)`` of the on-map tiles the camera shows, or None."""
+        engine = self.engine
+        size = engine.tile_size
+        col0, row0, col1, row1 = camera.visible_tiles(size)
+        col0, row0 = max(0, col0), max(0, row0)
+        col1, row1 = min(engine.cols, col1), min(engine.rows, row1)
+        if col0 >= col1 or row0 >= row1:
+            return None
+        left, top = camera.world_to_screen((col0 * size, row0 * size))
+        right, bottom = camera.world_to_screen((col1 * size, row1 * size))
+        return col0, row0, col1, row1, (round(left), round(top), round(right) - round(left), round(bottom) - round(top))
+
+    def changed(self, camera):
+        """Whether draw() would show something different from the cached frame."""
+        view = self.visible_view(camera)
+        if view != self.view:
+            return True
+        if view is None:
+            return False
+        col0, row0, col1, row1, _ = view
+        return bool(self.engine.grid(self.engine.dirty)[row0:row1, col0:col1].any())
+
+    def draw(self, target, camera):
+        """Draw the visible part of the map; returns the number of tiles rasterized."""
+        engine = self.engine
+        size = engine.tile_size
+        view = self.visible_view(camera)
+        if view is None:
+            self.view = None
+            return 0
+
+        col0, row0, col1, row1, screen_rect = view
+        rows, cols = slice(row0, row1), slice(col0, col1)
+        dirty = engine.grid(engine.dirty)[rows, cols]
+        rasterized = 0
+        if view != self.view or dirty.any():
+            colours = self.palette[self.palette_indices(rows, cols)]
+            pixels = pygame.surfarray.make_surface(colours.transpose(1, 0, 2))
+            self.frame = pygame.transform.scale(pixels, screen_rect[2:])
+            if size * camera.zoom >= GRID_MIN_TILE_PX:
+                thickness = max(1, int(camera.zoom))  # a 1px outline scaled with the tile
+                DRAW.blit(self.frame, self.grid_overlay(col1 - col0, row1 - row0, *screen_rect[2:], thickness), (0, 0))
+            self.view = view
+            dirty[:] = False
+            rasterized = (row1 - row0) * (col1 - col0)
+
+        DRAW.blit(target, self.frame, screen_rect[:2])
+        return rasterized
+
+
+TEXT_CACHE_MAX_ENTRIES = 512
+TEXT_CACHE_MAX_BYTES = 8 * 1024 * 1024
+
+
+class TextCache:
+    """LRU cache of rendered text surfaces keyed by font, string and colour.
+
+    Most labels (mode, prices, item counts) are identical from one frame to
+    the next, so they are rasterized once and reused until evicted.
+    """
+
+    def __init__(self, max_entries=TEXT_CACHE_MAX_ENTRIES, max_bytes=TEXT_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # key -> (surface, bytes)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color, antialias=True):
+        key = (font, text, tuple(color), antialias)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        size = surface.get_width() * surface.get_height() * surface.get_bytesize()
+        self.entries[key] = (surface, size)
+        self.bytes += size
+        while len(self.entries) > self.max_entries or (self.bytes > self.max_bytes and len(self.entries) > 1):
+            _, (_, evicted_size) = self.entries.popitem(last=False)
+            self.bytes -= evicted_size
+        return surface
+
+    def clear(self):
+        self.entries.clear()
+        self.bytes = 0
+
+
+TEXT_CACHE = TextCache()
+
+
+def render_text(font, text, color):
+    return TEXT_CACHE.render(font, text, color)
+
+
+class DrawCounter:
+    """Blits and rectangle draws that count themselves, for the profiler's draw_calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def blit(self, target, source, dest):
+        self.calls += 1
+        return target.blit(source, dest)
+
+    def rect(self, target, color, rect, width=0, **kwargs):
+        self.calls += 1
+        return pygame.draw.rect(target, color, rect, width, **kwargs)
+
+
+DRAW = DrawCounter()
@@ -0,0 +1,81 @@
+"""Replay a recorded play session headless, as fast as the CPU allows.
+
+Record with ``python Game/main.py --record session.jsonl``, then (from the
+``Hackathon`` directory, like the game itself)::
+
+    python Game/replay.py session.jsonl --runs 3
+
+Each run starts from a fresh farm and must end in the state hash the live
+session recorded (or the one given with ``--expect``), so a replay on a
+changed build shows whether the change altered any outcome. Recording turns
+off the reduced-rate simulation of distant chunks to make this possible.
+"""
+import os
+import sys
+import time
+import argparse
+
+# Must be set before pygame is imported by main
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from main import Game
+from recording import read_recording, state_hash
+from sim_clock import SimClock
+
+
+def replay(header, actions, end_tick=None):
+    """Play ``actions`` back on a fresh headless game and return the game.
+
+    Every action is applied after exactly as many ticks as when it was
+    recorded; the simulation then runs on to ``end_tick``.
+    """
+    game = Game(headless=True, world_size=(header["cols"], header["rows"]))
+    game.environment_file = header["environment_file"]
+    game.sim_clock = SimClock(header["tick_rate"])
+    dt = game.sim_clock.tick_dt
+
+    def run_until(tick):
+        while game.sim_clock.ticks < tick:
+            game.update(dt)
+
+    for tick, action, args in actions:
+        run_until(tick)
+        game.apply_action(action, *args)
+    run_until(end_tick if end_tick is not None else game.sim_clock.ticks)
+    return game
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Deterministic headless replay of recorded input")
+    parser.add_argument("recording")
+    parser.add_argument("--runs", type=int, default=2, help="replay this many times and check the outcomes match")
+    parser.add_argument("--expect", help="state hash every run must end in (default: the one recorded live)")
+    args = parser.parse_args(argv)
+
+    header, actions, end_tick, end_state = read_recording(args.recording)
+    expected = args.expect or end_state
+    hashes = []
+    for run in range(args.runs):
+        started = time.perf_counter()
+        game = replay(header, actions, end_tick)
+        elapsed = time.perf_counter() - started
+        hashes.append(state_hash(game))
+        print(f"Run {run + 1}: {len(actions)} actions, {game.sim_clock.ticks} ticks "
+              f"in {elapsed:.2f}s ({game.sim_clock.ticks / max(elapsed, 1e-9):.0f} ticks/s)  state {hashes[-1][:16]}")
+
+    if len(set(hashes)) > 1:
+        print("Replays diverged!")
+        return 1
+    if expected is None:
+        print("No recorded end state to compare with (the session didn't close cleanly)")
+    elif hashes[0] != expected:
+        print(f"Replays end in a different state than expected ({expected[:16]})!")
+        return 1
+    else:
+        print(f"Matches the expected state {expected[:16]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,320 @@
+"""Save file formats.
+
+The native format stores only tiles that differ from untouched grass, as
+packed column arrays behind a small JSON header, compressed with zlib::
+
+    b"AGDMSAVE" | uint16 version | zlib( uint32 header_len | header JSON | column bytes... )
+
+The autosaver writes full snapshots to ``autosave.sav`` and, between them,
+appends changed tiles to a journal (``autosave.sav.journal``): a sequence
+of ``uint32 length | save bytes`` records, each holding only the tiles that
+changed since the previous one.
+Records carry the ``generation`` of the snapshot they apply to, so a journal
+left over from an older snapshot is ignored.
+
+The old indented JSON format (one object per tile) is still available for
+import and export.
+"""
+import os
+import json
+import time
+import zlib
+import queue
+import struct
+import threading
+
+import numpy as np
+
+from tile_engine import sparse_tiles
+
+SAVE_FILE = "savegame.sav"
+AUTOSAVE_FILE = "autosave.sav"
+JOURNAL_FILE = AUTOSAVE_FILE + ".journal"
+JSON_SAVE_FILE = "savegame.json"
+
+AUTOSAVE_INTERVAL = 60  # real seconds between full snapshots
+JOURNAL_INTERVAL = 5  # real seconds between journal records
+
+SAVE_MAGIC = b"AGDMSAVE"
+SAVE_VERSION = 1
+
+
+class SaveFormatError(Exception):
+    pass
+
+
+def encode_save(meta, tiles):
+    """Pack ``meta`` (JSON-able dict) and sparse tile columns into save file bytes."""
+    names = list(tiles)
+    columns = [np.ascontiguousarray(tiles[name]) for name in names]
+    header = {
+        "meta": meta,
+        "tile_count": int(len(tiles["index"])),
+        "columns": [[name, col.dtype.str] for name, col in zip(names, columns)],
+    }
+    header_bytes = json.dumps(header).encode("utf-8")
+    body = b"".join([struct.pack("<I", len(header_bytes)), header_bytes] + [col.tobytes() for col in columns])
+    return SAVE_MAGIC + struct.pack("<H", SAVE_VERSION) + zlib.compress(body, 6)
+
+
+def decode_save(data):
+    """Inverse of encode_save: returns ``(meta, tiles)``."""
+    if not data.startswith(SAVE_MAGIC):
+        raise SaveFormatError("Not a save file")
+    offset = len(SAVE_MAGIC)
+    try:
+        (version,) = struct.unpack_from("<H", data, offset)
+    except struct.error:
+        raise SaveFormatError("Truncated save file")
+    if version > SAVE_VERSION:
+        raise SaveFormatError(f"Save version {version} is newer than this game ({SAVE_VERSION})")
+
+    try:
+        body = zlib.decompress(data[offset + 2:])
+    except zlib.error as e:
+        raise SaveFormatError(f"Corrupt save file: {e}")
+    # A body cut short or garbled fails in struct, json or numpy
+    try:
+        (header_len,) = struct.unpack_from("<I", body, 0)
+        header = json.loads(body[4:4 + header_len].decode("utf-8"))
+
+        count = header["tile_count"]
+        tiles = {}
+        offset = 4 + header_len
+        for name, dtype in header["columns"]:
+            dtype = np.dtype(dtype)
+            tiles[name] = np.frombuffer(body, dtype=dtype, count=count, offset=offset).copy()
+            offset += dtype.itemsize * count
+    except (struct.error, ValueError, KeyError, TypeError) as e:
+        raise SaveFormatError(f"Corrupt save file: {e}")
+    return header["meta"], tiles
+
+
+def write_save(path, meta, tiles):
+    """Write a save atomically: a crash mid-write leaves the old file intact."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(encode_save(meta, tiles))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def read_save(path):
+    with open(path, "rb") as f:
+        return decode_save(f.read())
+
+
+def append_journal(path, meta, tiles):
+    record = encode_save(meta, tiles)
+    with open(path, "ab") as f:
+        f.write(struct.pack("<I", len(record)) + record)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def read_journal(path, generation):
+    """``(meta, tiles)`` journal records that apply to snapshot ``generation``.
+
+    Reading stops at the first truncated or corrupt record, which is where a
+    crash interrupted the last append.
+    """
+    if not os.path.exists(path):
+        return []
+    with open(path, "rb") as f:
+        data = f.read()
+
+    records = []
+    offset = 0
+    while offset + 4 <= len(data):
+        (length,) = struct.unpack_from("<I", data, offset)
+        offset += 4
+        if offset + length > len(data):
+            break
+        try:
+            meta, tiles = decode_save(data[offset:offset + length])
+        except (SaveFormatError, ValueError):
+            break
+        offset += length
+        if meta.get("generation") == generation:
+            records.append((meta, tiles))
+    return records
+
+
+class AutoSaver:
+    """Saves the game in the background without stalling the game loop.
+
+    The main thread only copies the tile arrays; a worker thread diffs,
+    encodes and writes them. Every ``snapshot_interval`` seconds it writes a
+    full snapshot, and every ``journal_interval`` seconds in between it
+    appends the tiles that changed to the journal. Manual saves
+    (``save_copy``) go through the same worker.
+    """
+
+    def __init__(self, path=AUTOSAVE_FILE, journal_path=JOURNAL_FILE,
+                 snapshot_interval=AUTOSAVE_INTERVAL, journal_interval=JOURNAL_INTERVAL):
+        self.path = path
+        self.journal_path = journal_path
+        self.snapshot_interval = snapshot_interval
+        self.journal_interval = journal_interval
+
+        self.last_snapshot = time.monotonic()
+        self.last_journal = self.last_snapshot
+        self.needs_snapshot = False
+
+        self.jobs = queue.Queue()
+        self.results = queue.Queue()  # notifications for the game to show
+        self.worker = threading.Thread(target=self._work, name="autosave", daemon=True)
+        self.worker.start()
+
+        # Owned by the worker thread; journal records only follow a snapshot from this session
+        self._generation = None
+        self._last_columns = None
+
+    def update(self, game):
+        """Called once per frame; queues a snapshot or journal record when due."""
+        now = time.monotonic()
+        if self.needs_snapshot or now - self.last_snapshot >= self.snapshot_interval:
+            self.save_now(game)
+        elif now - self.last_journal >= self.journal_interval:
+            self.last_journal = now
+            self.jobs.put(("journal", game.save_meta(), game.engine.snapshot_columns()))
+
+    def save_now(self, game):
+        self.last_snapshot = self.last_journal = time.monotonic()
+        self.needs_snapshot = False
+        self.jobs.put(("snapshot", game.save_meta(), game.engine.snapshot_columns()))
+
+    def save_copy(self, game, path):
+        """Write a one-off full save of ``game`` to ``path`` in the background."""
+        self.jobs.put(("save", game.save_meta(), game.engine.snapshot_columns(), path))
+
+    def reset(self):
+        """Snapshot on the next update, e.g. after a load replaced the whole farm."""
+        self.needs_snapshot = True
+
+    def poll(self):
+        """Notifications from saves finished since the last call."""
+        messages = []
+        while not self.results.empty():
+            messages.append(self.results.get_nowait())
+        return messages
+
+    def close(self, game=None):
+        """Write a final snapshot of ``game`` (if given) and wait for the worker."""
+        if game is not None:
+            self.save_now(game)
+        self.jobs.put(None)
+        self.worker.join()
+
+    def _work(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            kind, meta, columns = job[:3]
+            try:
+                if kind == "save":
+                    write_save(job[3], meta, sparse_tiles(columns))
+                    self.results.put("Game saved!")
+                    continue
+                if kind == "snapshot":
+                    self._generation = time.time_ns()  # unique across sessions
+                    meta["generation"] = self._generation
+                    write_save(self.path, meta, sparse_tiles(columns))
+                    # The journal now belongs to the new snapshot
+                    open(self.journal_path, "wb").close()
+                elif self._generation:
+                    changed = np.zeros(len(columns["farm"]), dtype=bool)
+                    for name, column in columns.items():
+                        # building_timer moves with the production clock every tick; that clock
+                        # is in meta, so only buildings that were placed or removed are recorded
+                        if name != "building_timer":
+                            changed |= column != self._last_columns[name]
+                    meta["generation"] = self._generation
+                    append_journal(self.journal_path, meta, sparse_tiles(columns, changed))
+                self._last_columns = columns
+            except Exception as e:
+                self.results.put(f"Autosave failed: {e}")
+
+
+# -------------------
+# JSON import / export
+# -------------------
+
+def write_json_save(path, meta, tiles, tile_size, building_tags):
+    """Write the legacy format, which lists every tile of the ``meta`` grid."""
+    cols, rows = meta["cols"], meta["rows"]
+    seed_tags = meta["seed_tags"]
+
+    farm = np.zeros(cols * rows, dtype=bool)
+    humidity = np.full(cols * rows, 100.0)
+    planted_seed = np.zeros(cols * rows, dtype=np.int16)
+    growth_stage = np.zeros(cols * rows, dtype=np.int8)
+    growth_time = np.zeros(cols * rows)
+    withered = np.zeros(cols * rows, dtype=bool)
+    building = np.zeros(cols * rows, dtype=np.int8)
+    index = tiles["index"]
+    farm[index] = tiles["farm"]
+    humidity[index] = tiles["humidity"]
+    planted_seed[index] = tiles["planted_seed"]
+    growth_stage[index] = tiles["growth_stage"]
+    growth_time[index] = tiles["growth_time"]
+    withered[index] = tiles["withered"]
+    building[index] = tiles["building"]
+
+    data = {
+        "tiles": [{
+            "pos": ((i % cols) * tile_size, (i // cols) * tile_size),
+            "farm": f,
+            "humidity": h,
+            "planted_seed": seed_tags[s],
+            "growth_stage": g,
+            "growth_time": t,
+            "withered": w,
+            "building": building_tags[b],
+        } for i, (f, h, s, g, t, w, b) in enumerate(zip(
+            farm.tolist(), humidity.tolist(), planted_seed.tolist(), growth_stage.tolist(),
+            growth_time.tolist(), withered.tolist(), building.tolist(),
+        ))],
+    }
+    data.update({key: value for key, value in meta.items() if key not in ("cols", "rows", "seed_tags")})
+    with open(path, "w") as f:
+        json.dump(data, f, indent=4)
+
+
+def read_json_save(path, cols, tile_size, building_ids):
+    """Read a legacy JSON save into ``(meta, tiles)`` for a grid ``cols`` wide.
+
+    Saves that don't record when they were written get the file's
+    modification time as ``saved_at``.
+    """
+    with open(path, "r") as f:
+        data = json.load(f)
+    data.setdefault("saved_at", os.path.getmtime(path))
+
+    seed_tags = [None]
+    seed_ids = {None: 0}
+    tile_list = data.pop("tiles", [])
+    tiles = {
+        "index": np.array([(y // tile_size) * cols + x // tile_size for x, y in (t["pos"] for t in tile_list)],
+                          dtype=np.int32).reshape(-1),
+        "farm": np.array([t.get("farm", False) for t in tile_list], dtype=bool),
+        "humidity": np.array([t.get("humidity", 100) for t in tile_list], dtype=np.float64),
+        "planted_seed": np.array([seed_ids.setdefault(t.get("planted_seed"), len(seed_ids)) for t in tile_list],
+                                 dtype=np.int16),
+        "growth_stage": np.array([t.get("growth_stage", 0) for t in tile_list], dtype=np.int8),
+        "growth_time": np.array([t.get("growth_time", 0) for t in tile_list], dtype=np.float64),
+        "withered": np.array([t.get("withered", False) for t in tile_list], dtype=bool),
+        "building": np.array([building_ids.get(t.get("building"), 0) for t in tile_list], dtype=np.int8),
+    }
+    seed_tags += [tag for tag in seed_ids if tag is not None]
+
+    # Tiles off the left/right edge would wrap onto the next row
+    inside = np.array([0 <= t["pos"][0] < cols * tile_size and t["pos"][1] >= 0 for t in tile_list], dtype=bool)
+    tiles = {name: column[inside] for name, column in tiles.items()}
+
+    meta = dict(data)
+    meta["cols"] = cols
+    meta["seed_tags"] = seed_tags
+    return meta, tiles
@@ -0,0 +1,32 @@
+import heapq
+
+
+class ProductionScheduler:
+    """Priority queue of ``(due_time, tile_index)`` production events.
+
+    Popping is proportional to the number of events that are due, not to the
+    number of buildings. Entries are never removed in place: the owner checks
+    each popped event against its own state and drops stale ones.
+    """
+
+    def __init__(self):
+        self.heap = []
+
+    def __len__(self):
+        return len(self.heap)
+
+    def schedule(self, due, index):
+        heapq.heappush(self.heap, (due, index))
+
+    def rebuild(self, events):
+        """Replace every entry with ``events``, an iterable of ``(due, index)``."""
+        self.heap = list(events)
+        heapq.heapify(self.heap)
+
+    def pop_due(self, now):
+        """Remove and return all ``(due, index)`` events with ``due <= now``, earliest first."""
+        due_events = []
+        heap = self.heap
+        while heap and heap[0][0] <= now:
+            due_events.append(heapq.heappop(heap))
+        return due_events
@@ -0,0 +1,43 @@
+TICK_RATE = 20  # simulation ticks per simulated second
+TIME_SCALES = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000]
+MAX_TICKS_PER_FRAME = 1000
+
+
+class SimClock:
+    """Fixed-timestep accumulator that turns real frame time into simulation ticks.
+
+    Every tick advances the simulation by exactly ``tick_dt`` seconds, so the
+    outcome no longer depends on the frame rate. ``time_scale`` runs the
+    simulation faster than real time by handing out more ticks per frame.
+    """
+
+    def __init__(self, tick_rate=TICK_RATE, time_scale=1, max_ticks_per_frame=MAX_TICKS_PER_FRAME):
+        self.tick_rate = tick_rate
+        self.tick_dt = 1.0 / tick_rate
+        self.time_scale = time_scale
+        self.max_ticks_per_frame = max_ticks_per_frame
+        self.accumulator = 0.0
+        self.ticks = 0  # ticks run so far, counted by Game.update
+        self.dropped_time = 0.0  # simulated seconds skipped because a frame fell too far behind
+
+    def set_time_scale(self, time_scale):
+        self.time_scale = max(TIME_SCALES[0], min(TIME_SCALES[-1], time_scale))
+
+    def faster(self):
+        self.set_time_scale(next((s for s in TIME_SCALES if s > self.time_scale), TIME_SCALES[-1]))
+
+    def slower(self):
+        self.set_time_scale(next((s for s in reversed(TIME_SCALES) if s < self.time_scale), TIME_SCALES[0]))
+
+    def advance(self, real_dt):
+        """Add ``real_dt`` seconds of wall time and return how many ticks to run now."""
+        self.accumulator += real_dt * self.time_scale
+        ticks = int(self.accumulator * self.tick_rate)
+        if ticks > self.max_ticks_per_frame:
+            # Don't spiral: drop what can't be caught up within one frame
+            self.dropped_time += (ticks - self.max_ticks_per_frame) * self.tick_dt
+            ticks = self.max_ticks_per_frame
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= ticks * self.tick_dt
+        return ticks
@@ -0,0 +1,422 @@
+import numpy as np
+
+from crops import CropRegistry
+from scheduler import ProductionScheduler
+
+# ----------------------------------------
+# Tile simulation constants
+# ----------------------------------------
+
+DRY_RATE = 5  # humidity lost per second on farmed soil, on a reference day (see weather.py)
+FLOOD_FILL_RADIUS = 50  # flood fills reach at most this many tiles from where they start
+
+# Building ids stored in TileEngine.building (0 = no building)
+BUILDING_TAGS = [None, "MoneyFactory", "EnergyFactory", "FertilizerFactory"]
+BUILDING_IDS = {tag: i for i, tag in enumerate(BUILDING_TAGS) if tag}
+
+# Seconds between production cycles, indexed by building id
+BUILDING_PERIODS = np.array([np.inf, 5, 8, 6], dtype=np.float64)
+
+# Per-tile state columns and their value on untouched grass
+TILE_COLUMNS = {
+    "farm": False,
+    "humidity": 100.0,
+    "planted_seed": 0,
+    "growth_stage": 0,
+    "growth_time": 0.0,
+    "withered": False,
+    "building": 0,
+    "building_timer": 0.0,
+}
+
+
+class TileEngine:
+    """Struct-of-arrays store for every tile on the grid.
+
+    Tile ``i`` sits at column ``i % cols`` and row ``i // cols``, the same
+    row-major order the game has always used for ``Game.tiles``.
+    Crop behaviour comes from ``crops`` (a CropRegistry, by default the one
+    in crops.json); ``planted_seed`` holds its crop ids.
+    """
+
+    def __init__(self, cols, rows, tile_size, crops=None):
+        self.cols = cols
+        self.rows = rows
+        self.tile_size = tile_size
+        self.size = cols * rows
+
+        self.farm = np.zeros(self.size, dtype=bool)
+        self.humidity = np.full(self.size, 100.0, dtype=np.float64)
+        self.planted_seed = np.zeros(self.size, dtype=np.int16)  # 0 = nothing planted
+        self.growth_stage = np.zeros(self.size, dtype=np.int8)
+        self.growth_time = np.zeros(self.size, dtype=np.float64)
+        self.withered = np.zeros(self.size, dtype=bool)
+        self.building = np.zeros(self.size, dtype=np.int8)
+        self.building_timer = np.zeros(self.size, dtype=np.float64)  # only up to date after sync_building_timers()
+
+        # Building production is event driven: each building has one pending
+        # event at building_due[i] in self.production
+        self.time = 0.0  # seconds simulated by step_buildings
+        self.building_due = np.full(self.size, np.inf, dtype=np.float64)
+        self.production = ProductionScheduler()
+
+        # Tiles whose appearance may have changed since they were last drawn
+        self.dirty = np.ones(self.size, dtype=bool)
+
+        self.crops = crops if crops is not None else CropRegistry.load()
+        # Set from each day's weather: net humidity farmed soil loses per
+        # second (negative when rain wets it) and growth speed per crop id
+        self.dry_rate = float(DRY_RATE)
+        self.growth_rate = np.ones(len(self.crops), dtype=np.float64)
+
+        self.col = np.arange(self.size, dtype=np.int32) % cols
+        self.row = np.arange(self.size, dtype=np.int32) // cols
+
+    @property
+    def seed_tags(self):
+        """Seed id -> seed tag."""
+        return self.crops.tags
+
+    def seed_id(self, seed_tag):
+        return self.crops.id(seed_tag)
+
+    # -------------------
+    # Grid indexing
+    # -------------------
+
+    def index_at(self, x, y, origin=(0, 0)):
+        """Index of the tile under pixel ``(x, y)``, or None when off the grid.
+
+        ``origin`` is the world position drawn at the top-left of the screen.
+        """
+        col = int((x + origin[0]) // self.tile_size)
+        row = int((y + origin[1]) // self.tile_size)
+        if 0 <= col < self.cols and 0 <= row < self.rows:
+            return row * self.cols + col
+        return None
+
+    def rect_indices(self, a, b):
+        """``(rows, cols)`` array of the tile indices in the rectangle with corner tiles ``a`` and ``b``."""
+        col0, col1 = sorted((a % self.cols, b % self.cols))
+        row0, row1 = sorted((a // self.cols, b // self.cols))
+        return np.arange(row0, row1 + 1)[:, None] * self.cols + np.arange(col0, col1 + 1)
+
+    def flood_indices(self, index, eligible, radius=FLOOD_FILL_RADIUS):
+        """Indices of the tiles 4-connected to ``index`` through tiles that are ``eligible``.
+
+        ``eligible(indices)`` returns a boolean mask for an index array. The
+        fill stays within ``radius`` tiles of ``index``, so a click on open
+        grass can't spill over the whole map. Empty when ``index`` itself is
+        not eligible.
+        """
+        col, row = index % self.cols, index // self.cols
+        window = self.rect_indices(
+            max(0, row - radius) * self.cols + max(0, col - radius),
+            min(self.rows - 1, row + radius) * self.cols + min(self.cols - 1, col + radius),
+        )
+        allowed = eligible(window.ravel()).reshape(window.shape)
+        region = np.zeros(window.shape, dtype=bool)
+        region[window == index] = allowed[window == index]
+        # Grow the region one step in every direction until it stops changing
+        while True:
+            grown = region.copy()
+            grown[1:] |= region[:-1]
+            grown[:-1] |= region[1:]
+            grown[:, 1:] |= region[:, :-1]
+            grown[:, :-1] |= region[:, 1:]
+            grown &= allowed
+            if np.array_equal(grown, region):
+                return window[region]
+            region = grown
+
+    def grid(self, array):
+        """2D ``(rows, cols)`` view of one of the per-tile arrays."""
+        return array.reshape(self.rows, self.cols)
+
+    # -------------------
+    # Simulation
+    # -------------------
+
+    def step(self, dt, tiles=None):
+        """Advance drying, growth and withering of tiles by ``dt`` seconds.
+
+        ``tiles`` limits the step to that slice of the flat arrays, e.g. a
+        band of whole rows (the rest of the map is left alone); by default
+        every tile is stepped. Slicing keeps every column a view, so the step
+        works in place either way. Crops that reach their final stage are
+        harvested straight away: the tile goes back to grass. Returns
+        ``(indices, seed_ids)`` of the harvested tiles.
+        """
+        sel = slice(None) if tiles is None else tiles
+        farm = self.farm[sel]
+        humidity = self.humidity[sel]
+        planted_seed = self.planted_seed[sel]
+        growth_stage = self.growth_stage[sel]
+        growth_time = self.growth_time[sel]
+        withered = self.withered[sel]
+
+        planted = planted_seed != 0
+
+        soil = farm & (self.building[sel] == 0)
+        loss = self.dry_rate * dt
+        if loss >= 0:
+            changing = soil & (humidity > 0)
+            np.subtract(humidity, loss, out=humidity, where=changing)
+            np.maximum(humidity, 0, out=humidity)
+        else:
+            changing = soil & (humidity < 100)
+            np.subtract(humidity, loss, out=humidity, where=changing)
+            np.minimum(humidity, 100, out=humidity)
+        # Planted tiles are shaded by humidity, bare soil only changes colour
+        # below 30 (or when rain just lifted it past 30)
+        dirty = changing & (planted | (humidity < 30 + max(0.0, -loss)))
+
+        # Crop thresholds are looked up only for tiles with a living crop
+        crops = self.crops
+        alive = np.flatnonzero(planted & ~withered)
+        seed = planted_seed[alive].astype(np.intp)  # intp indexes the crop tables much faster than int16
+        moisture = humidity[alive]
+        withering = soil[alive] & (moisture <= crops.wither_humidity[seed])
+        withered[alive[withering]] = True
+        dirty[alive[withering]] = True
+
+        growing = ~withering & (moisture > crops.min_humidity[seed])
+        grow, seed = alive[growing], seed[growing]
+        time = growth_time[grow] + dt * self.growth_rate[seed]
+        growth_time[grow] = time
+
+        old_stage = growth_stage[grow]
+        stage = (time > crops.stage_1_time[seed]).astype(np.int8) + (time > crops.stage_2_time[seed])
+        growth_stage[grow] = stage
+        dirty[grow[stage != old_stage]] = True
+
+        harvested = grow[(old_stage < 2) & (stage == 2)]
+        seeds = planted_seed[harvested]
+        if harvested.size:
+            planted_seed[harvested] = 0
+            growth_stage[harvested] = 0
+            growth_time[harvested] = 0
+            withered[harvested] = False
+            farm[harvested] = False  # turns back to grass block
+
+        self.dirty[sel] |= dirty
+        return harvested + sel.indices(self.size)[0], seeds
+
+    def catch_up(self, elapsed, humidity_gain=None, dry_rate=None, growth_rate=None):
+        """Advance every tile by ``elapsed`` seconds in one closed-form step.
+
+        Follows the rules of step() in the limit of a small dt, without
+        looping: soil humidity changes linearly (``dry_rate``, less
+        ``humidity_gain`` per second where given, e.g. from fertilizer) between
+        0 and 100, crops grow (at ``growth_rate``) while it is above their
+        minimum humidity, wither when it falls to their wither humidity and are
+        harvested once they pass their last stage time. The rates default to
+        the engine's current ones; pass averages to cover many days of weather.
+        Returns ``(indices, seed_ids)`` of the harvested tiles, like step().
+        """
+        dry_rate = self.dry_rate if dry_rate is None else dry_rate
+        growth_rate = self.growth_rate if growth_rate is None else growth_rate
+        soil = self.farm & (self.building == 0)
+        rate = np.where(soil, float(dry_rate), 0.0)  # net humidity lost per second
+        if humidity_gain is not None:
+            rate -= np.where(self.farm, humidity_gain, 0.0)
+        falling = rate > 0
+        rising = rate < 0
+
+        crops = self.crops
+        seed = self.planted_seed
+        min_humidity = crops.min_humidity[seed]
+        wither_humidity = crops.wither_humidity[seed]
+        speed = growth_rate[seed]
+
+        h0 = self.humidity
+        alive = (seed != 0) & ~self.withered
+        above = h0 > min_humidity
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cross = np.where(rate != 0, (h0 - min_humidity) / rate, np.inf)  # reaches the growth threshold
+            dry = np.where(falling, (h0 - wither_humidity) / rate, np.inf)  # reaches the wither threshold
+            to_harvest = (crops.stage_2_time[seed] - self.growth_time) / speed  # seconds of growing left
+
+        # Window of [0, elapsed] during which humidity is above the growth threshold
+        start = np.where(rising & ~above, np.minimum(cross, elapsed), 0.0)
+        end = np.where(falling, np.where(above, np.minimum(cross, elapsed), 0.0), np.where(above | rising, elapsed, 0.0))
+
+        # step() withers these on the first tick, unless rain has already lifted them
+        withered_at_once = soil & alive & np.where(rising, h0 < wither_humidity, h0 <= wither_humidity)
+        growing = alive & ~withered_at_once & (end > start)
+        harvested = growing & (end - start > to_harvest)
+        withering = soil & alive & ~harvested & (withered_at_once | (dry <= elapsed))
+
+        # Humidity when the tile stops changing: at harvest, or at the end
+        stop = np.where(harvested, start + to_harvest, elapsed)
+        humidity = h0 - rate * stop
+        humidity = np.where(falling, np.maximum(humidity, 0), np.where(rising, np.minimum(humidity, 100), h0))
+        self.humidity[:] = np.where(self.farm, humidity, h0)
+
+        self.growth_time[growing] += ((end - start) * speed)[growing]
+        self.growth_stage[growing & (self.growth_time > crops.stage_1_time[seed])] = 1
+        self.withered |= withering
+
+        index = np.flatnonzero(harvested)
+        seeds = self.planted_seed[index]
+        self.planted_seed[index] = 0
+        self.growth_stage[index] = 0
+        self.growth_time[index] = 0
+        self.withered[index] = False
+        self.farm[index] = False
+        self.dirty[:] = True
+        return index, seeds
+
+    def step_buildings(self, dt):
+        """Advance the production clock by ``dt`` and return the buildings that produced.
+
+        A building that is due several times within ``dt`` (fast-forward)
+        appears once per production cycle.
+        """
+        self.time += dt
+        fired = []
+        for due, index in self.production.pop_due(self.time):
+            if self.building_due[index] != due:
+                continue  # building was removed or replaced since this was scheduled
+            period = BUILDING_PERIODS[self.building[index]]
+            while due <= self.time:
+                fired.append(index)
+                due += period
+            self.building_due[index] = due
+            self.production.schedule(due, index)
+        return np.array(fired, dtype=np.intp)
+
+    def catch_up_buildings(self, elapsed):
+        """Advance the production clock by ``elapsed`` in one go.
+
+        Returns ``(indices, cycles)``: the buildings that produced and how
+        many production cycles each completed, counted in closed form.
+        """
+        self.time += elapsed
+        index = np.flatnonzero(self.building_due <= self.time)
+        period = BUILDING_PERIODS[self.building[index]]
+        cycles = ((self.time - self.building_due[index]) // period).astype(np.intp) + 1
+        self.building_due[index] += cycles * period
+        scheduled = np.flatnonzero(self.building != 0)
+        self.production.rebuild(zip(self.building_due[scheduled].tolist(), scheduled.tolist()))
+        return index, cycles
+
+    def set_building(self, index, building_id, timer=0.0):
+        """Place (or with id 0, remove) a building whose production timer is at ``timer``."""
+        self.building[index] = building_id
+        self.building_timer[index] = timer if building_id else 0
+        if building_id:
+            due = self.time + BUILDING_PERIODS[building_id] - timer
+            self.building_due[index] = due
+            self.production.schedule(due, index)
+        else:
+            self.building_due[index] = np.inf
+
+    def sync_building_timers(self):
+        """Write each building's progress towards its next output into building_timer."""
+        has_building = self.building != 0
+        self.building_timer[has_building] = (
+            self.time - (self.building_due[has_building] - BUILDING_PERIODS[self.building[has_building]])
+        )
+
+    def reschedule_buildings(self):
+        """Rebuild the production queue from building and building_timer, e.g. after a load."""
+        index = np.flatnonzero(self.building != 0)
+        self.building_due[:] = np.inf
+        self.building_due[index] = self.time + BUILDING_PERIODS[self.building[index]] - self.building_timer[index]
+        self.production.rebuild(zip(self.building_due[index].tolist(), index.tolist()))
+
+    # -------------------
+    # Bulk edits
+    # -------------------
+
+    def plow(self, index):
+        self.farm[index] = True
+        self.dirty[index] = True
+
+    def water(self, index, amount):
+        self.humidity[index] = np.minimum(self.humidity[index] + amount, 100)
+        self.dirty[index] = True
+
+    def plant(self, index, seed_id):
+        self.planted_seed[index] = seed_id
+        self.growth_stage[index] = 0
+        self.growth_time[index] = 0
+        self.withered[index] = False
+        self.dirty[index] = True
+
+    def clear(self, index):
+        """Remove any crop from the tiles at ``index`` and turn them back to grass."""
+        self.plant(index, 0)
+        self.farm[index] = False
+
+    # -------------------
+    # Save / load
+    # -------------------
+
+    def export_tiles(self):
+        """Sparse copy of every tile that differs from untouched grass.
+
+        Returns ``{"index": int32 array, column: array, ...}`` for the columns
+        in TILE_COLUMNS; planted_seed holds ids into ``self.seed_tags``.
+        """
+        return sparse_tiles(self.snapshot_columns(copy=False))
+
+    def snapshot_columns(self, copy=True):
+        """Dense ``{column: array}`` of all tile state, copied unless ``copy`` is False."""
+        self.sync_building_timers()
+        return {name: getattr(self, name).copy() if copy else getattr(self, name) for name in TILE_COLUMNS}
+
+    def import_tiles(self, tiles, cols, seed_tags, reset=True, time=None):
+        """Load a sparse ``tiles`` mapping from export_tiles.
+
+        ``cols`` and ``seed_tags`` describe the grid and seed ids the tiles
+        were exported from; tiles that fall outside this grid are dropped.
+        With ``reset`` every other tile goes back to grass, otherwise only the
+        listed tiles change. ``time`` is the production clock (``self.time``)
+        the tiles were exported at: unlisted buildings keep producing up to
+        it, so their timers move on by the time in between. Seed tags are
+        mapped onto this engine's crop ids; a crop missing from its registry
+        raises ValueError before anything is changed.
+        """
+        seed_ids = np.array([self.seed_id(tag) for tag in seed_tags] or [0], dtype=np.int16)
+        if reset:
+            for name, default in TILE_COLUMNS.items():
+                getattr(self, name)[:] = default
+        else:
+            self.sync_building_timers()  # keep the progress of buildings not in ``tiles``
+            if time is not None:
+                has_building = self.building != 0
+                periods = BUILDING_PERIODS[self.building[has_building]]
+                self.building_timer[has_building] = (self.building_timer[has_building] + time - self.time) % periods
+        if time is not None:
+            self.time = time
+
+        col = tiles["index"] % cols
+        row = tiles["index"] // cols
+        inside = (col < self.cols) & (row < self.rows)
+        index = (row * self.cols + col)[inside]
+        for name in TILE_COLUMNS:
+            if name in tiles:
+                getattr(self, name)[index] = np.asarray(tiles[name])[inside]
+
+        self.planted_seed[index] = seed_ids[self.planted_seed[index]]
+        self.reschedule_buildings()
+        self.dirty[:] = True
+
+
+def sparse_tiles(columns, changed=None):
+    """Pick the rows of dense ``columns`` that differ from untouched grass.
+
+    ``changed`` can be a boolean mask to pick instead. Returns the same
+    ``{"index": ..., column: ...}`` mapping as TileEngine.export_tiles.
+    """
+    if changed is None:
+        changed = np.zeros(len(columns["farm"]), dtype=bool)
+        for name, default in TILE_COLUMNS.items():
+            changed |= columns[name] != default
+    index = np.flatnonzero(changed)
+    tiles = {"index": index.astype(np.int32)}
+    for name in TILE_COLUMNS:
+        tiles[name] = columns[name][index]
+    return tiles
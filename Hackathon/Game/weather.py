@@ -0,0 +1,48 @@
+import numpy as np
+
+from climate import CLIMATE_FIELDS
+from tile_engine import DRY_RATE
+
+# The day DRY_RATE and full-speed crop growth were tuned for. A day with
+# these readings (or without climate data) plays like the flat old model.
+REFERENCE_DAY = {"T2M": 20.0, "GWETTOP": 0.5, "PRECTOTCORR": 0.0, "ALLSKY_SFC_SW_DWN": 4.5}
+
+HARGREAVES_OFFSET = 17.8  # °C; evaporation scales with T + 17.8, as in the Hargreaves equation
+RAIN_HUMIDITY_PER_MM = 0.5  # soil humidity gained per second for each mm/day of rain
+
+
+def readings(values):
+    """ClimateStore rows (``[..., field]``) with missing readings taken from REFERENCE_DAY."""
+    reference = np.array([REFERENCE_DAY[field] for field in CLIMATE_FIELDS])
+    values = np.asarray(values, dtype=np.float64)
+    return np.where(np.isnan(values), reference, values)
+
+
+def daily_rates(values, crops):
+    """Tile simulation rates for one or more days of climate readings.
+
+    ``values`` holds ClimateStore rows. Returns ``(dry_rate, growth_rate)``:
+    the net humidity farmed soil loses per second (evaporation driven by
+    heat, sunshine and dry topsoil, less rain; negative on wet days) and the
+    growth speed of every crop id from temperature and light. Both are
+    computed once per day, so the per-tile cost of a tick does not change.
+    """
+    filled = readings(values)
+    temperature, wetness, rain, radiation = (filled[..., CLIMATE_FIELDS.index(field)] for field in (
+        "T2M", "GWETTOP", "PRECTOTCORR", "ALLSKY_SFC_SW_DWN"))
+
+    heat = np.maximum(temperature + HARGREAVES_OFFSET, 0) / (REFERENCE_DAY["T2M"] + HARGREAVES_OFFSET)
+    sun = np.maximum(radiation, 0) / REFERENCE_DAY["ALLSKY_SFC_SW_DWN"]
+    dryness = 1 + REFERENCE_DAY["GWETTOP"] - np.clip(wetness, 0, 1)
+    dry_rate = DRY_RATE * heat * sun * dryness - RAIN_HUMIDITY_PER_MM * np.maximum(rain, 0)
+
+    # Below the reference radiation crops are short of light
+    light = np.minimum(sun, 1.0)
+    growth_rate = crops.growth_rates(temperature) * light[..., None]
+    return dry_rate, growth_rate
+
+
+def mean_rates(values, weights, crops):
+    """daily_rates averaged over days with ``weights`` (e.g. seconds spent in each)."""
+    dry_rate, growth_rate = daily_rates(values, crops)
+    return float(np.average(dry_rate, weights=weights)), np.average(growth_rate, axis=0, weights=weights)
@@ -0,0 +1,153 @@
+import numpy as np
+
+CHUNK_SIZE = 32  # tiles along each side of a chunk
+FAR_CHUNK_INTERVAL = 8  # chunks away from the camera are stepped once every this many ticks
+NEAR_CHUNK_MARGIN = 1  # chunks around the view that still simulate at full rate
+LOD_MIN_TILES = 256 * 256  # below this, stepping every tile costs no more than skipping distant ones
+
+MIN_ZOOM = 0.25
+MAX_ZOOM = 3.0
+
+
+class Camera:
+    """Maps between screen pixels and world pixels.
+
+    ``x``/``y`` is the world position shown at the top-left of the screen and
+    ``zoom`` how many screen pixels one world pixel covers.
+    """
+
+    def __init__(self, view_size, world_size):
+        self.view_w, self.view_h = view_size
+        self.world_w, self.world_h = world_size
+        self.x = 0.0
+        self.y = 0.0
+        self.zoom = 1.0
+
+    @property
+    def origin(self):
+        return (self.x, self.y)
+
+    def screen_to_world(self, pos):
+        return (pos[0] / self.zoom + self.x, pos[1] / self.zoom + self.y)
+
+    def world_to_screen(self, pos):
+        return ((pos[0] - self.x) * self.zoom, (pos[1] - self.y) * self.zoom)
+
+    def world_to_screen_rect(self, rect):
+        left, top = self.world_to_screen(rect.topleft)
+        right, bottom = self.world_to_screen(rect.bottomright)
+        return (round(left), round(top), round(right) - round(left), round(bottom) - round(top))
+
+    def pan(self, dx, dy):
+        """Move the view by ``(dx, dy)`` screen pixels."""
+        self.x += dx / self.zoom
+        self.y += dy / self.zoom
+        self.clamp()
+
+    def zoom_at(self, factor, screen_pos):
+        """Zoom by ``factor`` keeping the world point under ``screen_pos`` in place."""
+        wx, wy = self.screen_to_world(screen_pos)
+        self.zoom = max(MIN_ZOOM, min(MAX_ZOOM, self.zoom * factor))
+        self.x = wx - screen_pos[0] / self.zoom
+        self.y = wy - screen_pos[1] / self.zoom
+        self.clamp()
+
+    def clamp(self):
+        view_w, view_h = self.view_w / self.zoom, self.view_h / self.zoom
+        self.x = min(max(0.0, self.x), max(0.0, self.world_w - view_w))
+        self.y = min(max(0.0, self.y), max(0.0, self.world_h - view_h))
+
+    def visible_tiles(self, tile_size):
+        """``(col0, row0, col1, row1)`` tile range on screen, end-exclusive and not clipped."""
+        col0 = int(self.x // tile_size)
+        row0 = int(self.y // tile_size)
+        col1 = int((self.x + self.view_w / self.zoom) // tile_size) + 1
+        row1 = int((self.y + self.view_h / self.zoom) // tile_size) + 1
+        return col0, row0, col1, row1
+
+
+class ChunkGrid:
+    """Splits a TileEngine's grid into square chunks of ``chunk_size`` tiles."""
+
+    def __init__(self, engine, chunk_size=CHUNK_SIZE):
+        self.engine = engine
+        self.chunk_size = chunk_size
+        self.chunk_cols = -(-engine.cols // chunk_size)
+        self.chunk_rows = -(-engine.rows // chunk_size)
+
+    def row_slice(self, chunk_row0, chunk_row1=None):
+        """Flat slice of the tiles in chunk rows ``chunk_row0`` up to ``chunk_row1`` (end-exclusive).
+
+        Whole rows of tiles are contiguous in the engine's row-major arrays,
+        so stepping such a band works on views rather than copies.
+        """
+        chunk_row1 = chunk_row0 + 1 if chunk_row1 is None else chunk_row1
+        cols, size = self.engine.cols, self.chunk_size
+        return slice(chunk_row0 * size * cols, min(chunk_row1 * size, self.engine.rows) * cols)
+
+    def chunks_in(self, col0, row0, col1, row1):
+        """Chunks overlapping the end-exclusive tile range, clipped to the map."""
+        size = self.chunk_size
+        return [
+            (chunk_row, chunk_col)
+            for chunk_row in range(max(0, row0 // size), min(self.chunk_rows, -(-row1 // size)))
+            for chunk_col in range(max(0, col0 // size), min(self.chunk_cols, -(-col1 // size)))
+        ]
+
+
+class SimulationLOD:
+    """Steps the chunk rows near the camera every tick and distant ones less often.
+
+    The map is simulated in bands of whole chunk rows, each a contiguous
+    slice of the tile arrays. Bands overlapping the focus are stepped every
+    tick; the rest are split into ``interval`` groups and each tick one group
+    is stepped. Every band remembers the tick it was last stepped on and is
+    always stepped by exactly the time since, so the whole map moves at the
+    same simulated speed however the focus moves, for about ``1/interval`` of
+    the per-tick cost away from the camera.
+    """
+
+    def __init__(self, chunks, interval=FAR_CHUNK_INTERVAL):
+        self.chunks = chunks
+        self.interval = interval
+        self.tick = 0
+        self.near = None  # (first, end) chunk rows stepped every tick
+        self.stepped_at = np.zeros(chunks.chunk_rows, dtype=np.int64)  # tick each band was last stepped on
+        self.last_stepped = 0  # tiles stepped by the last call to step()
+
+    def set_focus(self, near_chunks):
+        """Step the chunk rows of ``near_chunks`` (``(chunk_row, chunk_col)`` pairs) every tick."""
+        rows = [chunk_row for chunk_row, _ in near_chunks]
+        self.near = (min(rows), max(rows) + 1) if rows else None
+
+    def step(self, engine, dt):
+        """Like ``engine.step(dt)``, at reduced rate away from the focus."""
+        self.tick += 1
+        if self.near is None:
+            self.stepped_at[:] = self.tick
+            self.last_stepped = engine.size
+            return engine.step(dt)
+
+        chunks = self.chunks
+        first, end = self.near
+        stepped = []
+        # A band that just came near first makes up the ticks it missed while far
+        for band in range(first, end):
+            missed = self.tick - 1 - self.stepped_at[band]
+            if missed:
+                stepped.append(engine.step(dt * missed, chunks.row_slice(band)))
+        near = chunks.row_slice(first, end)
+        stepped.append(engine.step(dt, near))
+        self.stepped_at[first:end] = self.tick
+        self.last_stepped = near.stop - near.start
+
+        for band in range(self.tick % self.interval, chunks.chunk_rows, self.interval):
+            if first <= band < end:
+                continue
+            far = chunks.row_slice(band)
+            stepped.append(engine.step(dt * (self.tick - self.stepped_at[band]), far))
+            self.stepped_at[band] = self.tick
+            self.last_stepped += far.stop - far.start
+
+        harvested, seeds = zip(*stepped)
+        return np.concatenate(harvested), np.concatenate(seeds)